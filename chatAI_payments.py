@@ -1,7 +1,14 @@
-import csv
+import argparse
+import os
 import random
+import time
 from datetime import datetime, timedelta
 
+import numpy as np
+
+from chatAI_shards import run_shards, shard_bounds, shard_filename, shard_seeds, write_manifest
+from chatAI_sinks import SINKS, open_sink, output_path, write_chunks
+
 # Define constants
 NUM_RECORDS = 50000
 SUBSCRIPTION_IDS = list(range(1, 10001))
@@ -18,40 +25,16 @@ PRODUCT_AMOUNTS = {
     5: 330
 }
 
-# Assign each subscription_id a fixed product_id and country_id
-subscription_data = {
-    sub_id: {
-        "product_id": random.choices(PRODUCT_IDS, weights=[PRODUCT_DISTRIBUTION[p] for p in PRODUCT_IDS])[0],
-        "country_id": random.choice(COUNTRY_IDS),
-        "sub_start_date": None  # Will be assigned later
-    }
-    for sub_id in SUBSCRIPTION_IDS
-}
+START_DATE = datetime(2024, 1, 1)
+END_DATE = datetime(2025, 5, 1)
+LATE_PRODUCT_START = datetime(2024, 1, 10)  # Products 4 and 5 launched later
+LAST_PAYMENT_DATE = datetime(2025, 5, 30)
+PAYMENT_INTERVAL_DAYS = 30
 
-# Generate weighted start dates (more subscriptions as time progresses)
-start_date = datetime(2024, 1, 1)
-end_date = datetime(2025, 5, 1)
-dates = []
-while len(dates) < len(SUBSCRIPTION_IDS):
-    for month in range(18):
-        count = (month + 1) * (len(SUBSCRIPTION_IDS) // 100)
-        new_dates = [
-            start_date + timedelta(days=random.randint(0, (end_date - start_date).days))
-            for _ in range(count)
-        ]
-        dates.extend(new_dates)
-random.shuffle(dates)
-dates = dates[:len(SUBSCRIPTION_IDS)]  # Ensure it has exactly the right number of entries
-
-# Assign sub_start_date to subscriptions
-for i, sub_id in enumerate(SUBSCRIPTION_IDS):
-    subscription_data[sub_id]["sub_start_date"] = dates[i]
-
-# Adjust sub_start_date for product 4 and 5
-for sub_id, data in subscription_data.items():
-    if data["product_id"] in [4, 5] and data["sub_start_date"] < datetime(2024, 1, 10):
-        data["sub_start_date"] = datetime(2024, 1, 10) + timedelta(
-            days=random.randint(0, (end_date - datetime(2024, 1, 10)).days))
+CSV_HEADER = [
+    "payment_id", "subscription_id", "product_id", "country_id",
+    "sub_start_date", "sub_end_date", "amount", "payment_date"
+]
 
 
 # Function to calculate next payment date
@@ -62,44 +45,392 @@ def get_next_payment_date(sub_start_date, last_payment_date):
     return next_date if next_date <= datetime(2025, 5, 30) else None
 
 
-# Generate payments
-payments = []
-last_payment_dates = {}
+def generate_payments_legacy(num_records=NUM_RECORDS):
+    """Original pure-Python generator: one random draw and dict lookup per row"""
+    return [row for rows in iter_payments_legacy(num_records) for row in rows]
+
+
+def iter_payments_legacy(num_records=NUM_RECORDS, chunk_size=100_000):
+    """generate_payments_legacy as lists of at most chunk_size rows"""
+    # Assign each subscription_id a fixed product_id and country_id
+    subscription_data = {
+        sub_id: {
+            "product_id": random.choices(PRODUCT_IDS, weights=[PRODUCT_DISTRIBUTION[p] for p in PRODUCT_IDS])[0],
+            "country_id": random.choice(COUNTRY_IDS),
+            "sub_start_date": None  # Will be assigned later
+        }
+        for sub_id in SUBSCRIPTION_IDS
+    }
+
+    # Generate weighted start dates (more subscriptions as time progresses)
+    start_date = START_DATE
+    end_date = END_DATE
+    dates = []
+    while len(dates) < len(SUBSCRIPTION_IDS):
+        for month in range(18):
+            count = (month + 1) * (len(SUBSCRIPTION_IDS) // 100)
+            new_dates = [
+                start_date + timedelta(days=random.randint(0, (end_date - start_date).days))
+                for _ in range(count)
+            ]
+            dates.extend(new_dates)
+    random.shuffle(dates)
+    dates = dates[:len(SUBSCRIPTION_IDS)]  # Ensure it has exactly the right number of entries
+
+    # Assign sub_start_date to subscriptions
+    for i, sub_id in enumerate(SUBSCRIPTION_IDS):
+        subscription_data[sub_id]["sub_start_date"] = dates[i]
+
+    # Adjust sub_start_date for product 4 and 5
+    for sub_id, data in subscription_data.items():
+        if data["product_id"] in [4, 5] and data["sub_start_date"] < datetime(2024, 1, 10):
+            data["sub_start_date"] = datetime(2024, 1, 10) + timedelta(
+                days=random.randint(0, (end_date - datetime(2024, 1, 10)).days))
+
+    # Generate payments
+    payments = []
+    last_payment_dates = {}
+
+    for i in range(num_records):
+        subscription_id = random.choice(SUBSCRIPTION_IDS)
+        product_id = subscription_data[subscription_id]["product_id"]
+        country_id = subscription_data[subscription_id]["country_id"]
+        sub_start_date = subscription_data[subscription_id]["sub_start_date"]
+
+        # Ensure monthly payment_date for each subscription
+        last_payment_date = last_payment_dates.get(subscription_id, None)
+        payment_date = get_next_payment_date(sub_start_date, last_payment_date)
+
+        if payment_date is None:
+            continue  # Stop adding payments if the date exceeds the limit
+
+        last_payment_dates[subscription_id] = payment_date
+
+        # Set amount based on product_id
+        if isinstance(PRODUCT_AMOUNTS[product_id], tuple):
+            amount = round(random.uniform(*PRODUCT_AMOUNTS[product_id]), 2)
+        else:
+            amount = PRODUCT_AMOUNTS[product_id]
+
+        payments.append([
+            i + 1, subscription_id, product_id, country_id,
+            sub_start_date.strftime('%Y-%m-%d'), '',
+            amount, payment_date.strftime('%Y-%m-%d')
+        ])
+        if len(payments) == chunk_size:
+            yield payments
+            payments = []
+
+    if payments:
+        yield payments
+
+
+# Vectorised engine: the same distributions as generate_payments_legacy, built from
+# NumPy arrays so hundreds of millions of rows can be generated in chunks.
+
+def _day(value):
+    return np.datetime64(value.date(), 'D')
+
+
+def assign_subscriptions(num_subscriptions, rng):
+    """Product, country and start date for every subscription, as arrays indexed by subscription_id - 1
+
+    Start dates are uniform over [START_DATE, END_DATE] like the legacy generator (its monthly
+    weighting draws every date from the full range), and products 4/5 starting before
+    LATE_PRODUCT_START are redrawn from [LATE_PRODUCT_START, END_DATE].
+    """
+    products = np.array(PRODUCT_IDS, dtype=np.int8)
+    weights = np.array([PRODUCT_DISTRIBUTION[p] for p in PRODUCT_IDS])
+    product_id = rng.choice(products, size=num_subscriptions, p=weights / weights.sum())
+    country_id = rng.choice(np.array(COUNTRY_IDS, dtype=np.int16), size=num_subscriptions)
+
+    start = _day(START_DATE) + rng.integers(0, (END_DATE - START_DATE).days + 1, num_subscriptions)
+    late = np.isin(product_id, [4, 5]) & (start < _day(LATE_PRODUCT_START))
+    start[late] = _day(LATE_PRODUCT_START) + rng.integers(
+        0, (END_DATE - LATE_PRODUCT_START).days + 1, int(late.sum())
+    )
+
+    return {
+        'subscription_id': np.arange(1, num_subscriptions + 1, dtype=np.int64),
+        'product_id': product_id,
+        'country_id': country_id,
+        'sub_start_date': start.astype('datetime64[D]'),
+    }
+
+
+def _rank_within_chunk(values):
+    """0-based occurrence number of each value among earlier equal values in the array"""
+    order = np.argsort(values, kind='stable')
+    sorted_values = values[order]
+    is_start = np.empty(len(values), dtype=bool)
+    is_start[:1] = True
+    is_start[1:] = sorted_values[1:] != sorted_values[:-1]
+    group_start = np.maximum.accumulate(np.where(is_start, np.arange(len(values)), 0))
+    ranks = np.empty(len(values), dtype=np.int64)
+    ranks[order] = np.arange(len(values)) - group_start
+    return ranks
+
+
+def _amounts(product_id, rng):
+    """Per-product amounts: uniform ranges rounded to cents, fixed prices as-is"""
+    low = np.zeros(max(PRODUCT_IDS) + 1)
+    high = np.zeros(max(PRODUCT_IDS) + 1)
+    for product, amount in PRODUCT_AMOUNTS.items():
+        low[product], high[product] = amount if isinstance(amount, tuple) else (amount, amount)
+    return np.round(rng.uniform(low[product_id], high[product_id]), 2)
+
+
+def generate_payment_chunks(num_records=NUM_RECORDS, num_subscriptions=len(SUBSCRIPTION_IDS),
+                            seed=None, chunk_size=1_000_000):
+    """Yield payments as dicts of column arrays, chunk by chunk
+
+    Mirrors the legacy loop: each of num_records draws picks a subscription uniformly,
+    the draw becomes that subscription's next 30-day payment, and draws past
+    LAST_PAYMENT_DATE are dropped (payment_id keeps the draw number, so ids have gaps).
+    Per-subscription payment counts carry over between chunks, so the result does not
+    depend on chunk_size.
+    """
+    # Independent streams so the draws do not depend on how the records are chunked
+    subs_rng, draw_rng, amount_rng = np.random.default_rng(seed).spawn(3)
+    subs = assign_subscriptions(num_subscriptions, subs_rng)
+    payments_so_far = np.zeros(num_subscriptions, dtype=np.int64)
+    last_payment = _day(LAST_PAYMENT_DATE)
 
-for i in range(NUM_RECORDS):
-    subscription_id = random.choice(SUBSCRIPTION_IDS)
-    product_id = subscription_data[subscription_id]["product_id"]
-    country_id = subscription_data[subscription_id]["country_id"]
-    sub_start_date = subscription_data[subscription_id]["sub_start_date"]
+    for chunk_start in range(0, num_records, chunk_size):
+        size = min(chunk_size, num_records - chunk_start)
+        # floor(u * n) consumes exactly one 64-bit draw per record, unlike integers()
+        sub_index = (draw_rng.random(size) * num_subscriptions).astype(np.int64)
 
-    # Ensure monthly payment_date for each subscription
-    last_payment_date = last_payment_dates.get(subscription_id, None)
-    payment_date = get_next_payment_date(sub_start_date, last_payment_date)
+        payment_number = payments_so_far[sub_index] + _rank_within_chunk(sub_index) + 1
+        payments_so_far += np.bincount(sub_index, minlength=num_subscriptions)
 
-    if payment_date is None:
-        continue  # Stop adding payments if the date exceeds the limit
+        start = subs['sub_start_date'][sub_index]
+        payment_date = start + payment_number * PAYMENT_INTERVAL_DAYS
+        # The first payment is always recorded; later ones stop at LAST_PAYMENT_DATE
+        keep = (payment_number == 1) | (payment_date <= last_payment)
 
-    last_payment_dates[subscription_id] = payment_date
+        sub_index = sub_index[keep]
+        product_id = subs['product_id'][sub_index]
+        yield {
+            'payment_id': np.arange(chunk_start + 1, chunk_start + size + 1, dtype=np.int64)[keep],
+            'subscription_id': subs['subscription_id'][sub_index],
+            'product_id': product_id,
+            'country_id': subs['country_id'][sub_index],
+            'sub_start_date': start[keep],
+            'sub_end_date': np.full(len(sub_index), np.datetime64('NaT'), dtype='datetime64[D]'),
+            'amount': _amounts(product_id, amount_rng),
+            'payment_date': payment_date[keep],
+        }
 
-    # Set amount based on product_id
-    if isinstance(PRODUCT_AMOUNTS[product_id], tuple):
-        amount = round(random.uniform(*PRODUCT_AMOUNTS[product_id]), 2)
+
+def generate_payments_numpy(num_records=NUM_RECORDS, num_subscriptions=len(SUBSCRIPTION_IDS),
+                            seed=None, chunk_size=1_000_000):
+    """All payments as one dict of column arrays"""
+    chunks = list(generate_payment_chunks(num_records, num_subscriptions, seed, chunk_size))
+    return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in CSV_HEADER}
+
+
+def format_payment_rows(columns):
+    """Rows of CSV cells from a dict of column arrays (empty string for missing dates)"""
+    def dates(values):
+        text = np.datetime_as_string(values, unit='D')
+        return np.where(np.isnat(values), '', text).tolist()
+
+    return zip(
+        columns['payment_id'].tolist(), columns['subscription_id'].tolist(),
+        columns['product_id'].tolist(), columns['country_id'].tolist(),
+        dates(columns['sub_start_date']), dates(columns['sub_end_date']),
+        columns['amount'].tolist(), dates(columns['payment_date'])
+    )
+
+
+# Schedule index: every subscription's whole payment timeline as compact arrays, so an exact
+# number of payments can be sampled without the legacy loop's wasted draws.
+
+class PaymentSchedule:
+    """Array-backed payment timelines, indexed by subscription_id - 1
+
+    Subscription i pays on sub_start_date + 30 * k for k = 1..payment_counts[i]: up to
+    LAST_PAYMENT_DATE (the first payment always counts, as in the legacy loop), and with
+    churn_rate > 0 only for a Geometric(churn_rate) number of months. Churned subscriptions
+    get sub_end_date = last payment + 30 days when that falls by LAST_PAYMENT_DATE.
+    Payments are stored in CSR layout: those of subscription i are entries
+    offsets[i]:offsets[i + 1].
+    """
+
+    def __init__(self, subscriptions, churn_rate=0.0, rng=None):
+        rng = rng if rng is not None else np.random.default_rng()
+        self.subscriptions = subscriptions
+        start = subscriptions['sub_start_date']
+        allowed = np.maximum(
+            (_day(LAST_PAYMENT_DATE) - start).astype(np.int64) // PAYMENT_INTERVAL_DAYS, 1)
+
+        self.sub_end_date = np.full(len(start), np.datetime64('NaT'), dtype='datetime64[D]')
+        if churn_rate > 0:
+            lifetime = rng.geometric(churn_rate, len(start))
+            self.payment_counts = np.minimum(lifetime, allowed)
+            end = start + (lifetime + 1) * PAYMENT_INTERVAL_DAYS
+            churned = end <= _day(LAST_PAYMENT_DATE)
+            self.sub_end_date[churned] = end[churned]
+        else:
+            self.payment_counts = allowed
+        self.offsets = np.concatenate([[0], np.cumsum(self.payment_counts)])
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def payment_dates(self, subscription_id):
+        """All payment dates of one subscription"""
+        i = subscription_id - 1
+        k = np.arange(1, self.payment_counts[i] + 1)
+        return self.subscriptions['sub_start_date'][i] + k * PAYMENT_INTERVAL_DAYS
+
+    def pays_on(self, subscription_id, date):
+        """Whether the subscription has a payment on date, in O(1)"""
+        i = subscription_id - 1
+        days = int((np.datetime64(date, 'D') - self.subscriptions['sub_start_date'][i]).astype(np.int64))
+        k, remainder = divmod(days, PAYMENT_INTERVAL_DAYS)
+        return remainder == 0 and 1 <= k <= self.payment_counts[i]
+
+    def sample(self, num_payments, rng):
+        """Exactly num_payments payments as a dict of column arrays, payment_id 1..num_payments
+
+        Each subscription's payments arrive as a rate-1 Poisson process and the earliest
+        num_payments arrivals overall are kept. This is the legacy loop (every draw advances
+        a uniformly chosen subscription) without draws landing on exhausted subscriptions,
+        and every subscription still contributes a prefix of its timeline.
+        """
+        if num_payments > len(self):
+            raise ValueError(f"Schedule holds {len(self)} payments, {num_payments} requested")
+        owner = np.repeat(np.arange(len(self.payment_counts)), self.payment_counts)
+        arrival = np.cumsum(rng.exponential(size=len(self)))
+        arrival -= np.concatenate([[0.0], arrival])[self.offsets[:-1]][owner]
+
+        chosen = np.argpartition(arrival, num_payments - 1)[:num_payments] if num_payments else owner[:0]
+        chosen = chosen[np.argsort(arrival[chosen], kind='stable')]
+        sub_index = owner[chosen]
+        payment_number = chosen - self.offsets[sub_index] + 1
+
+        start = self.subscriptions['sub_start_date'][sub_index]
+        product_id = self.subscriptions['product_id'][sub_index]
+        return {
+            'payment_id': np.arange(1, num_payments + 1, dtype=np.int64),
+            'subscription_id': self.subscriptions['subscription_id'][sub_index],
+            'product_id': product_id,
+            'country_id': self.subscriptions['country_id'][sub_index],
+            'sub_start_date': start,
+            'sub_end_date': self.sub_end_date[sub_index],
+            'amount': _amounts(product_id, rng),
+            'payment_date': start + payment_number * PAYMENT_INTERVAL_DAYS,
+        }
+
+
+def generate_payments_schedule(num_payments=NUM_RECORDS, num_subscriptions=len(SUBSCRIPTION_IDS),
+                               seed=None, churn_rate=0.0):
+    """Exactly num_payments payments sampled from a PaymentSchedule, as column arrays"""
+    subs_rng, churn_rng, sample_rng = np.random.default_rng(seed).spawn(3)
+    schedule = PaymentSchedule(assign_subscriptions(num_subscriptions, subs_rng), churn_rate, churn_rng)
+    return schedule.sample(num_payments, sample_rng)
+
+
+def iter_column_chunks(columns, chunk_size=100_000):
+    """Slices of a dict of equal-length column arrays, chunk_size rows each"""
+    size = len(next(iter(columns.values())))
+    for first in range(0, size, chunk_size):
+        yield {name: values[first:first + chunk_size] for name, values in columns.items()}
+
+
+def _write_payment_shard(task):
+    """One shard: its own subscriptions and its share of the draws, ids shifted into its key range"""
+    first_subscription, last_subscription = task['keys']['subscription_id']
+    first_draw, last_draw = task['keys']['draw']
+
+    def rows():
+        for chunk in generate_payment_chunks(last_draw - first_draw,
+                                             last_subscription - first_subscription + 1,
+                                             task['seed'], task['chunk_size']):
+            chunk['subscription_id'] += first_subscription - 1
+            chunk['payment_id'] += first_draw
+            yield list(format_payment_rows(chunk))
+
+    return write_chunks(rows(), open_sink(task['format'], task['path'], CSV_HEADER), report=None)
+
+
+def generate_payments_sharded(output_dir, shard_count, num_records=NUM_RECORDS,
+                              num_subscriptions=len(SUBSCRIPTION_IDS), seed=None, fmt='csv',
+                              workers=None, chunk_size=100_000):
+    """Split subscription_id ranges into shard_count files on a process pool, plus a manifest
+
+    Each shard owns a contiguous subscription_id range and the matching share of the draws
+    (and so of payment_id), and runs the NumPy engine on its own SeedSequence child.
+    Returns the manifest dict.
+    """
+    if not 1 <= shard_count <= num_subscriptions:
+        raise ValueError(f"shard_count must be between 1 and {num_subscriptions}, got {shard_count}")
+    root, seeds = shard_seeds(seed, shard_count)
+    subscription_bounds = shard_bounds(num_subscriptions, shard_count)
+    draw_bounds = shard_bounds(num_records, shard_count)
+    os.makedirs(output_dir, exist_ok=True)
+
+    tasks = [{
+        'index': index,
+        'path': os.path.join(output_dir, shard_filename('payments', index, shard_count, SINKS[fmt].extension)),
+        'keys': {
+            'subscription_id': [subscription_bounds[index] + 1, subscription_bounds[index + 1]],
+            'draw': [draw_bounds[index], draw_bounds[index + 1]],
+        },
+        'seed': seeds[index],
+        'format': fmt,
+        'chunk_size': chunk_size,
+    } for index in range(shard_count)]
+
+    results = run_shards(_write_payment_shard, tasks, workers)
+    return write_manifest(os.path.join(output_dir, 'payments.manifest.json'), root, tasks, results,
+                          dataset='payments', format=fmt, records=num_records,
+                          subscriptions=num_subscriptions)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate synthetic payments")
+    parser.add_argument('--engine', choices=['legacy', 'numpy', 'schedule'], default='legacy',
+                        help='schedule: exactly --records payments from a PaymentSchedule')
+    parser.add_argument('--records', type=int, default=NUM_RECORDS,
+                        help='payment draws (payments for the schedule engine)')
+    parser.add_argument('--subscriptions', type=int, default=len(SUBSCRIPTION_IDS),
+                        help='numpy and schedule engines only')
+    parser.add_argument('--churn-rate', type=float, default=0.0,
+                        help='monthly churn probability, schedule engine only')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--format', choices=sorted(SINKS), default='csv')
+    parser.add_argument('--chunk-size', type=int, default=100_000, help='rows per chunk')
+    parser.add_argument('--output', default=None, help='default: payments.<format>')
+    parser.add_argument('--shards', type=int, default=0,
+                        help='write this many shard files plus a manifest (numpy engine)')
+    parser.add_argument('--workers', type=int, default=None, help='processes for --shards')
+    parser.add_argument('--output-dir', default='payments_shards', help='directory for --shards')
+    args = parser.parse_args()
+
+    if args.shards:
+        started = time.perf_counter()
+        manifest = generate_payments_sharded(args.output_dir, args.shards, args.records,
+                                             args.subscriptions, args.seed, args.format,
+                                             args.workers, args.chunk_size)
+        seconds = time.perf_counter() - started
+        print(f"{args.output_dir}: {manifest['rows']} rows in {args.shards} shards in {seconds:.2f}s "
+              f"({manifest['rows'] / seconds:,.0f} rows/s)")
     else:
-        amount = PRODUCT_AMOUNTS[product_id]
-
-    payments.append([
-        i + 1, subscription_id, product_id, country_id,
-        sub_start_date.strftime('%Y-%m-%d'), '',
-        amount, payment_date.strftime('%Y-%m-%d')
-    ])
-
-# Write to CSV
-with open("payments.csv", "w", newline="") as file:
-    writer = csv.writer(file)
-    writer.writerow([
-        "payment_id", "subscription_id", "product_id", "country_id",
-        "sub_start_date", "sub_end_date", "amount", "payment_date"
-    ])
-    writer.writerows(payments)
-
-print("CSV file 'payments.csv' generated successfully.")
\ No newline at end of file
+        if args.engine == 'legacy':
+            if args.seed is not None:
+                random.seed(args.seed)
+            chunks = iter_payments_legacy(args.records, args.chunk_size)
+        elif args.engine == 'schedule':
+            payments = generate_payments_schedule(args.records, args.subscriptions, args.seed,
+                                                  args.churn_rate)
+            chunks = (list(format_payment_rows(chunk)) for chunk in iter_column_chunks(payments,
+                                                                                      args.chunk_size))
+        else:
+            chunks = (list(format_payment_rows(chunk)) for chunk in generate_payment_chunks(
+                args.records, args.subscriptions, args.seed, args.chunk_size))
+
+        output = args.output or output_path('payments', args.format)
+        write_chunks(chunks, open_sink(args.format, output, CSV_HEADER))
\ No newline at end of file
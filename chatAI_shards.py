@@ -0,0 +1,71 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+# Sharded generation: the key space is cut into a fixed number of shards, each shard gets
+# its own child of one SeedSequence and writes its own file. Shard contents depend only on
+# (seed, shard_count, shard index), never on how many worker processes run them, so
+# 1 worker and N workers produce byte-identical files.
+
+def shard_seeds(seed, shard_count):
+    """Root SeedSequence (its entropy goes into the manifest) and one child per shard"""
+    root = np.random.SeedSequence(seed)
+    return root, root.spawn(shard_count)
+
+
+def shard_bounds(total, shard_count):
+    """shard_count + 1 boundaries splitting range(total) into near-equal contiguous parts"""
+    return [total * i // shard_count for i in range(shard_count + 1)]
+
+
+def shard_filename(stem, index, shard_count, extension):
+    return f"{stem}-{index:05d}-of-{shard_count:05d}{extension}"
+
+
+def run_shards(worker, tasks, workers=None):
+    """worker(task) for every task, results in task order; workers=1 runs in-process"""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) <= 1:
+        return [worker(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        return list(pool.map(worker, tasks))
+
+
+def file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_manifest(path, root_seed, tasks, results, **meta):
+    """JSON manifest: generation parameters, root entropy and one entry per shard file
+
+    Timings are left out so the manifest is as reproducible as the shards themselves.
+    """
+    shards = []
+    for task, stats in zip(tasks, results):
+        shards.append({
+            'index': task['index'],
+            'file': os.path.basename(task['path']),
+            'keys': task['keys'],
+            'rows': stats['rows'],
+            'bytes': stats['bytes'],
+            'sha256': file_sha256(task['path']),
+        })
+    manifest = {
+        **meta,
+        'entropy': str(root_seed.entropy),
+        'shard_count': len(tasks),
+        'rows': sum(shard['rows'] for shard in shards),
+        'shards': shards,
+    }
+    with open(path, 'w') as file:
+        json.dump(manifest, file, indent=2)
+        file.write('\n')
+    return manifest
@@ -0,0 +1,159 @@
+import csv
+import gzip
+import io
+import json
+import os
+import time
+
+
+# Output sinks for the synthetic data generators. Generators yield fixed-size chunks
+# (lists of rows) and a sink writes each chunk as it arrives, so memory stays bounded
+# by the chunk size rather than the file size.
+
+class CsvSink:
+    extension = '.csv'
+
+    def __init__(self, path, header):
+        self.path = path
+        self.header = list(header)
+        self.rows_written = 0
+        self._file = self._open()
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.header)
+
+    def _open(self):
+        return open(self.path, 'w', newline='')
+
+    def write(self, rows):
+        self._writer.writerows(rows)
+        self.rows_written += len(rows)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class GzipCsvSink(CsvSink):
+    extension = '.csv.gz'
+
+    def _open(self):
+        # mtime=0 keeps the gzip header, and so the file, reproducible for a given seed
+        raw = gzip.GzipFile(self.path, 'wb', compresslevel=6, mtime=0)
+        return io.TextIOWrapper(raw, newline='')
+
+
+class JsonlSink:
+    """One JSON object per line, the same layout as requests.jsonl"""
+    extension = '.jsonl'
+
+    def __init__(self, path, header):
+        self.path = path
+        self.header = list(header)
+        self.rows_written = 0
+        self._file = open(self.path, 'w')
+
+    def write(self, rows):
+        self._file.writelines(json.dumps(dict(zip(self.header, row))) + '\n' for row in rows)
+        self.rows_written += len(rows)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ParquetSink:
+    """One row group per chunk; the schema is taken from the first chunk. Needs pyarrow."""
+    extension = '.parquet'
+
+    def __init__(self, path, header):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._pq = pq
+        self.path = path
+        self.header = list(header)
+        self.rows_written = 0
+        self._writer = None
+
+    def write(self, rows):
+        if not rows:
+            return
+        columns = {name: list(values) for name, values in zip(self.header, zip(*rows))}
+        if self._writer is None:
+            table = self._pa.Table.from_pydict(columns)
+            self._writer = self._pq.ParquetWriter(self.path, table.schema)
+        else:
+            table = self._pa.Table.from_pydict(columns, schema=self._writer.schema)
+        self._writer.write_table(table)
+        self.rows_written += len(rows)
+
+    def close(self):
+        if self._writer is None:
+            # No rows at all: still leave a readable file with string columns
+            schema = self._pa.schema([(name, self._pa.string()) for name in self.header])
+            self._writer = self._pq.ParquetWriter(self.path, schema)
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+SINKS = {
+    'csv': CsvSink,
+    'csv.gz': GzipCsvSink,
+    'jsonl': JsonlSink,
+    'parquet': ParquetSink,
+}
+
+
+def open_sink(fmt, path, header):
+    try:
+        sink_class = SINKS[fmt]
+    except KeyError:
+        raise ValueError(f"Unknown output format {fmt!r}; expected one of {sorted(SINKS)}")
+    return sink_class(path, header)
+
+
+def output_path(stem, fmt):
+    return stem + SINKS[fmt].extension
+
+
+def write_chunks(chunks, sink, report=print):
+    """Drain an iterable of row chunks into sink, then report rows/s and MB/s
+
+    Closes the sink and returns a stats dict (rows, chunks, bytes, seconds, rows_per_second).
+    """
+    started = time.perf_counter()
+    chunk_count = 0
+    with sink:
+        for rows in chunks:
+            sink.write(rows)
+            chunk_count += 1
+    seconds = time.perf_counter() - started
+
+    stats = {
+        'rows': sink.rows_written,
+        'chunks': chunk_count,
+        'bytes': os.path.getsize(sink.path),
+        'seconds': seconds,
+        'rows_per_second': sink.rows_written / seconds if seconds else 0.0,
+    }
+    if report:
+        report(f"{sink.path}: {stats['rows']} rows in {stats['chunks']} chunks, "
+               f"{stats['bytes'] / 1e6:.1f} MB in {seconds:.2f}s "
+               f"({stats['rows_per_second']:,.0f} rows/s, {stats['bytes'] / 1e6 / (seconds or 1):.1f} MB/s)")
+    return stats
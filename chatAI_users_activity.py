@@ -1,13 +1,26 @@
+import argparse
 import csv
+import gzip
+import itertools
+import os
 import random
+import time
 from datetime import datetime, timedelta
 
+import numpy as np
+
+from chatAI_shards import run_shards, shard_bounds, shard_filename, shard_seeds, write_manifest
+from chatAI_sinks import SINKS, open_sink, output_path, write_chunks
+
 # Define constants
 START_DATE = datetime(2024, 1, 1)
 END_DATE = datetime(2025, 5, 30)
 PRODUCT_IDS = [1, 2, 3, 4, 5]
 COUNTRY_IDS = list(range(1, 11))
 
+CSV_HEADER = ["date", "type", "product_id", "country_id", "active_users", "new_users", "churned_users"]
+ACTIVITY_WINDOW_DAYS = 30  # rolling_30d window, also how long one payment keeps a subscription active
+
 # Generate date range for calendar_month and rolling_30d
 def generate_dates(start, end, frequency='daily'):
     current = start
@@ -22,34 +35,385 @@ def generate_dates(start, end, frequency='daily'):
             current += timedelta(days=1)
     return dates
 
-calendar_month_dates = generate_dates(START_DATE, END_DATE, 'monthly')
-rolling_30d_dates = generate_dates(START_DATE, END_DATE, 'daily')
+# Vectorised calendars: whole date x product x country grids as NumPy columns, with each
+# date formatted once rather than once per product and country.
+
+def calendar_dates(start, end, frequency='daily'):
+    """datetime64[D] dates from start to end inclusive
+
+    daily and weekly step 1 / 7 days from start; monthly is start then the 1st of each later
+    month (as generate_dates); iso_week is the Monday of every ISO week overlapping the range.
+    """
+    start = np.datetime64(start, 'D')
+    end = np.datetime64(end, 'D')
+    if frequency == 'daily':
+        return np.arange(start, end + 1, dtype='datetime64[D]')
+    if frequency == 'weekly':
+        return np.arange(start, end + 1, 7, dtype='datetime64[D]')
+    if frequency == 'monthly':
+        months = np.arange(start.astype('datetime64[M]'), end.astype('datetime64[M]') + 1)
+        dates = months.astype('datetime64[D]')
+        dates[0] = start
+        return dates
+    if frequency == 'iso_week':
+        # 1970-01-01 was a Thursday, so (days + 3) % 7 is the weekday with Monday = 0
+        first_monday = start - (start.astype(np.int64) + 3) % 7
+        return np.arange(first_monday, end + 1, 7, dtype='datetime64[D]')
+    raise ValueError(f"Unknown frequency {frequency!r}; expected daily, weekly, monthly or iso_week")
+
+
+def iso_week_labels(dates):
+    """'YYYY-Www' ISO week of each datetime64[D] date"""
+    thursday = dates - (dates.astype(np.int64) + 3) % 7 + 3  # ISO years are decided by Thursdays
+    year = thursday.astype('datetime64[Y]')
+    week = (thursday - year.astype('datetime64[D]')).astype(np.int64) // 7 + 1
+    return np.array([f"{y}-W{w:02d}" for y, w in zip(year.astype(np.int64) + 1970, week)])
+
+
+def cross_join(dates, product_ids=PRODUCT_IDS, country_ids=COUNTRY_IDS, start=0, stop=None):
+    """Rows start:stop of the date x product x country grid as columns, in generate_activity_data order
+
+    Dates are stored once, not per row: date_labels holds the ISO string of each date and
+    date_index gives every row's position in dates / date_labels, so a grid costs a few
+    integers per row however long its date strings are.
+    """
+    products = np.asarray(product_ids)
+    countries = np.asarray(country_ids)
+    keys_per_date = len(products) * len(countries)
+    size = len(dates) * keys_per_date
+    stop = size if stop is None else min(stop, size)
+    first_date, first_key = divmod(start, keys_per_date) if keys_per_date else (0, 0)
+    periods = -(-(first_key + stop - start) // keys_per_date) if keys_per_date else 0
+
+    def rows(per_date):
+        # per_date repeats every keys_per_date rows; cut rows start:stop out of enough periods
+        return np.tile(per_date, periods)[first_key:first_key + stop - start]
+
+    return {
+        'dates': dates,
+        'date_labels': np.datetime_as_string(dates, unit='D').astype('U10'),
+        'date_index': np.repeat(np.arange(first_date, first_date + periods, dtype=np.int32),
+                                keys_per_date)[first_key:first_key + stop - start],
+        'product_id': rows(np.repeat(products, len(countries))),
+        'country_id': rows(np.tile(countries, len(products))),
+    }
+
+
+def row_dates(grid):
+    """Each row's ISO date string; rows of one date share a single str object"""
+    return grid['date_labels'].astype(object)[grid['date_index']]
+
+
+def calendar_grid(start, end, frequency='daily', product_ids=PRODUCT_IDS, country_ids=COUNTRY_IDS):
+    """cross_join over calendar_dates; iso_week grids also get per-date iso_week_labels"""
+    dates = calendar_dates(start, end, frequency)
+    grid = cross_join(dates, product_ids, country_ids)
+    if frequency == 'iso_week':
+        grid['iso_week_labels'] = iso_week_labels(dates)
+    return grid
+
+
+def generate_activity_columns(grid, activity_type, rng):
+    """generate_activity_data's random values for a whole grid at once (NumPy Generator)"""
+    size = len(grid['date_index'])
+    active_users = rng.integers(100, 10000, size, endpoint=True)
+    new_users = rng.integers((0.1 * active_users).astype(np.int64), (0.6 * active_users).astype(np.int64),
+                             endpoint=True)
+    churned_users = rng.integers((0.02 * active_users).astype(np.int64), (0.1 * active_users).astype(np.int64),
+                                 endpoint=True)
+    return {
+        'date': row_dates(grid),
+        'type': np.full(size, activity_type),
+        'product_id': grid['product_id'],
+        'country_id': grid['country_id'],
+        'active_users': active_users,
+        'new_users': new_users,
+        'churned_users': churned_users,
+    }
+
+
+def iter_activity_columns(start, end, activity_type, rng, frequency='daily', product_ids=PRODUCT_IDS,
+                          country_ids=COUNTRY_IDS, chunk_size=100_000):
+    """Row chunks of generate_activity_columns over calendar_dates(start, end, frequency)
+
+    Every chunk cross-joins only its own chunk_size rows and the dates they fall on, so memory
+    stays bounded however many products and countries there are.
+    """
+    dates = calendar_dates(start, end, frequency)
+    keys_per_date = len(product_ids) * len(country_ids)
+    size = len(dates) * keys_per_date
+    for first in range(0, size, chunk_size):
+        last = min(first + chunk_size, size)
+        first_date, last_date = first // keys_per_date, (last - 1) // keys_per_date
+        offset = first_date * keys_per_date
+        grid = cross_join(dates[first_date:last_date + 1], product_ids, country_ids, first - offset, last - offset)
+        columns = generate_activity_columns(grid, activity_type, rng)
+        yield list(zip(*(columns[name].tolist() for name in CSV_HEADER)))
+
 
 # Generate user activity data
 def generate_activity_data(date_list, activity_type):
+    return [row for rows in iter_activity_data(date_list, activity_type) for row in rows]
+
+
+def iter_activity_data(date_list, activity_type, chunk_size=100_000, rng=random, start=0, stop=None):
+    """generate_activity_data as lists of at most chunk_size rows
+
+    start/stop select a slice of the date x product x country grid and rng replaces the
+    global random module, which is how sharded generation gives each shard its own stream.
+    """
     activity_data = []
-    for date in date_list:
-        for product_id in PRODUCT_IDS:
-            for country_id in COUNTRY_IDS:
-                active_users = random.randint(100, 10000)
-                new_users = random.randint(int(0.1 * active_users), int(0.6 * active_users))
-                churned_users = random.randint(int(0.02 * active_users), int(0.1 * active_users))
-                activity_data.append([
-                    date.strftime('%Y-%m-%d'), activity_type, product_id, country_id,
-                    active_users, new_users, churned_users
-                ])
-    return activity_data
-
-calendar_month_data = generate_activity_data(calendar_month_dates, 'calendar_month')
-rolling_30d_data = generate_activity_data(rolling_30d_dates, 'rolling_30d')
-
-# Combine data
-all_activity_data = calendar_month_data + rolling_30d_data
-
-# Write to CSV
-with open("users_activity.csv", "w", newline="") as file:
-    writer = csv.writer(file)
-    writer.writerow(["date", "type", "product_id", "country_id", "active_users", "new_users", "churned_users"])
-    writer.writerows(all_activity_data)
-
-print("CSV file 'users_activity.csv' generated successfully.")
\ No newline at end of file
+    keys = itertools.product(date_list, PRODUCT_IDS, COUNTRY_IDS)
+    for date, product_id, country_id in itertools.islice(keys, start, stop):
+        active_users = rng.randint(100, 10000)
+        new_users = rng.randint(int(0.1 * active_users), int(0.6 * active_users))
+        churned_users = rng.randint(int(0.02 * active_users), int(0.1 * active_users))
+        activity_data.append([
+            date.strftime('%Y-%m-%d'), activity_type, product_id, country_id,
+            active_users, new_users, churned_users
+        ])
+        if len(activity_data) == chunk_size:
+            yield activity_data
+            activity_data = []
+    if activity_data:
+        yield activity_data
+
+
+def activity_grids():
+    """(activity_type, dates) in output order: calendar_month rows first, then rolling_30d"""
+    return [
+        ('calendar_month', generate_dates(START_DATE, END_DATE, 'monthly')),
+        ('rolling_30d', generate_dates(START_DATE, END_DATE, 'daily')),
+    ]
+
+
+def _write_activity_shard(task):
+    """One shard: a contiguous slice of the concatenated type x date x product x country grid"""
+    first_row, last_row = task['keys']['row']
+    rng = random.Random(task['seed'].generate_state(4).tobytes())
+    grid_size = len(PRODUCT_IDS) * len(COUNTRY_IDS)
+
+    chunks = []
+    offset = 0
+    for activity_type, dates in activity_grids():
+        size = len(dates) * grid_size
+        start, stop = max(first_row - offset, 0), min(last_row - offset, size)
+        if start < stop:
+            chunks.append(iter_activity_data(dates, activity_type, task['chunk_size'], rng, start, stop))
+        offset += size
+
+    return write_chunks(itertools.chain.from_iterable(chunks),
+                        open_sink(task['format'], task['path'], CSV_HEADER), report=None)
+
+
+def generate_activity_sharded(output_dir, shard_count, seed=None, fmt='csv', workers=None,
+                              chunk_size=100_000):
+    """Split the activity grid into shard_count files on a process pool, plus a manifest
+
+    Concatenating the shard files in index order gives the same row order as the single-file
+    output. Returns the manifest dict.
+    """
+    total_rows = sum(len(dates) for _, dates in activity_grids()) * len(PRODUCT_IDS) * len(COUNTRY_IDS)
+    root, seeds = shard_seeds(seed, shard_count)
+    bounds = shard_bounds(total_rows, shard_count)
+    os.makedirs(output_dir, exist_ok=True)
+
+    tasks = [{
+        'index': index,
+        'path': os.path.join(output_dir, shard_filename('users_activity', index, shard_count,
+                                                        SINKS[fmt].extension)),
+        'keys': {'row': [bounds[index], bounds[index + 1]]},
+        'seed': seeds[index],
+        'format': fmt,
+        'chunk_size': chunk_size,
+    } for index in range(shard_count)]
+
+    results = run_shards(_write_activity_shard, tasks, workers)
+    return write_manifest(os.path.join(output_dir, 'users_activity.manifest.json'), root, tasks, results,
+                          dataset='users_activity', format=fmt)
+
+
+# Event-level derivation: active/new/churned computed from subscription starts and payments
+# (rows laid out like chatAI_payments.CSV_HEADER), so rolling_30d, calendar_month and the
+# payments data all agree with each other.
+
+def read_payment_rows(path):
+    """Rows of a payments CSV (optionally .gz) without the header, streamed"""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', newline='') as file:
+        reader = csv.reader(file)
+        next(reader, None)
+        yield from reader
+
+
+def _key_index(product_id, country_id, product_ids, country_ids):
+    """Position of each (product_id, country_id) in the product x country grid, -1 if not in it"""
+    def lookup(values, ids):
+        ids = np.asarray(ids)
+        order = np.argsort(ids)
+        found = order[np.searchsorted(ids, values, sorter=order).clip(max=len(ids) - 1)]
+        return np.where(ids[found] == values, found, -1)
+
+    product = lookup(product_id, product_ids)
+    country = lookup(country_id, country_ids)
+    return np.where((product >= 0) & (country >= 0), product * len(country_ids) + country, -1)
+
+
+def _last_payment_per_subscription(columns):
+    """One entry per subscription_id (sorted), the one holding its latest payment_day"""
+    order = np.lexsort((columns['payment_day'], columns['subscription_id']))
+    ids = columns['subscription_id'][order]
+    last = order[np.append(ids[1:] != ids[:-1], True)]
+    return {name: values[last] for name, values in columns.items()}
+
+
+def collect_activity_events(payment_rows, start=START_DATE, end=END_DATE, product_ids=PRODUCT_IDS,
+                            country_ids=COUNTRY_IDS, chunk_size=100_000):
+    """Every subscription's grid key and active interval [start_day, churn_day), as NumPy arrays
+
+    Returns ({'subscription_id', 'key', 'start_day', 'churn_day'} sorted by subscription_id,
+    num_days). Days are offsets from start; key is the position of (product_id, country_id) in
+    the product x country grid. A subscription churns on sub_end_date when set, otherwise
+    ACTIVITY_WINDOW_DAYS after its last payment. Rows are reduced to one entry per subscription
+    chunk by chunk, so memory follows the number of subscriptions, not payments. Keys outside
+    the grid and empty intervals are dropped.
+    """
+    origin = np.datetime64(start, 'D')
+    num_days = int((np.datetime64(end, 'D') - origin).astype(np.int64)) + 1
+    payment_rows = iter(payment_rows)
+    reduced = []
+    while True:
+        chunk = list(itertools.islice(payment_rows, chunk_size))
+        if not chunk:
+            break
+        _, subscription_id, product_id, country_id, sub_start, sub_end, _, payment_date = zip(*chunk)
+        sub_end = np.array(sub_end, dtype='datetime64[D]')
+        payment_day = (np.array(payment_date, dtype='datetime64[D]') - origin).astype(np.int64)
+        reduced.append(_last_payment_per_subscription({
+            'subscription_id': np.array(subscription_id, dtype=np.int64),
+            'key': _key_index(np.array(product_id, dtype=np.int64), np.array(country_id, dtype=np.int64),
+                              product_ids, country_ids),
+            'start_day': (np.array(sub_start, dtype='datetime64[D]') - origin).astype(np.int64),
+            'end_day': np.where(np.isnat(sub_end), payment_day + ACTIVITY_WINDOW_DAYS,
+                                (sub_end - origin).astype(np.int64)),
+            'payment_day': payment_day,
+        }))
+
+    if reduced:
+        columns = _last_payment_per_subscription(
+            {name: np.concatenate([part[name] for part in reduced]) for name in reduced[0]})
+    else:
+        columns = {name: np.zeros(0, dtype=np.int64)
+                   for name in ['subscription_id', 'key', 'start_day', 'end_day', 'payment_day']}
+    keep = (columns['key'] >= 0) & (columns['end_day'] > columns['start_day'])
+    return {
+        'subscription_id': columns['subscription_id'][keep],
+        'key': columns['key'][keep],
+        'start_day': columns['start_day'][keep],
+        'churn_day': columns['end_day'][keep],
+    }, num_days
+
+
+def _window_counts(events, num_keys, num_days, first_days, last_days):
+    """(active, new, churned) arrays of shape (num_keys, windows) for windows first..last day
+
+    A subscription is active in a window when [start_day, churn_day) overlaps it; new and
+    churned count starts and churns on days inside both the window and the data. Running totals
+    of starts and churns per key and day are built once, and every window is a difference of
+    two of them, so each window costs O(1) whatever its length: its active users are those
+    started by its last day minus those churned by its first.
+    """
+    base = min(int(first_days.min(initial=0)), 0) - 1  # rolling windows begin before day 0
+    size = num_days - base + 1
+
+    def running_total(days):
+        # Days outside [base, num_days] move to the edge: they compare the same with every query
+        slots = events['key'] * size + np.clip(days, base, num_days) - base
+        return np.cumsum(np.bincount(slots, minlength=num_keys * size).reshape(num_keys, size), axis=1)
+
+    started = running_total(events['start_day'])
+    churned = running_total(events['churn_day'])
+    last = last_days - base
+    before = np.maximum(first_days, 0) - 1 - base
+    return (started[:, last] - churned[:, first_days - base],
+            started[:, last] - started[:, before],
+            churned[:, last] - churned[:, before])
+
+
+def derive_activity_data(payment_rows, start=START_DATE, end=END_DATE, chunk_size=100_000,
+                         product_ids=PRODUCT_IDS, country_ids=COUNTRY_IDS):
+    """calendar_month then rolling_30d rows derived from payment rows, as row chunks
+
+    rolling_30d on day d covers the ACTIVITY_WINDOW_DAYS days ending on d; calendar_month rows
+    are dated on the 1st and cover that month (up to end). Same layout as iter_activity_data.
+    """
+    events, num_days = collect_activity_events(payment_rows, start, end, product_ids, country_ids, chunk_size)
+    num_keys = len(product_ids) * len(country_ids)
+    month_dates = calendar_dates(start, end, 'monthly')
+    day_dates = calendar_dates(start, end, 'daily')
+    month_firsts = (month_dates - month_dates[0]).astype(np.int64)
+    days = np.arange(num_days)
+    windows = [
+        ('calendar_month', month_dates, month_firsts, np.append(month_firsts[1:], num_days) - 1),
+        ('rolling_30d', day_dates, days - ACTIVITY_WINDOW_DAYS + 1, days),
+    ]
+
+    for activity_type, dates, first_days, last_days in windows:
+        grid = cross_join(dates, product_ids, country_ids)
+        # (keys, windows) -> rows in date-major grid order
+        active, new, churned = (counts.T.ravel() for counts in
+                                _window_counts(events, num_keys, num_days, first_days, last_days))
+        columns = [row_dates(grid), np.full(len(active), activity_type), grid['product_id'],
+                   grid['country_id'], active, new, churned]
+        for first in range(0, len(active), chunk_size):
+            yield list(zip(*(column[first:first + chunk_size].tolist() for column in columns)))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate synthetic users activity")
+    parser.add_argument('--engine', choices=['legacy', 'numpy'], default='legacy',
+                        help='numpy: vectorised calendar grid and random values')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--format', choices=sorted(SINKS), default='csv')
+    parser.add_argument('--chunk-size', type=int, default=100_000, help='rows per chunk')
+    parser.add_argument('--output', default=None, help='default: users_activity.<format>')
+    parser.add_argument('--shards', type=int, default=0, help='write this many shard files plus a manifest')
+    parser.add_argument('--workers', type=int, default=None, help='processes for --shards')
+    parser.add_argument('--output-dir', default='users_activity_shards', help='directory for --shards')
+    parser.add_argument('--derive-from', default=None, metavar='PAYMENTS_CSV',
+                        help='derive activity from a payments CSV instead of random values')
+    args = parser.parse_args()
+
+    if args.derive_from:
+        output = args.output or output_path('users_activity', args.format)
+        write_chunks(derive_activity_data(read_payment_rows(args.derive_from), chunk_size=args.chunk_size),
+                     open_sink(args.format, output, CSV_HEADER))
+    elif args.shards:
+        started = time.perf_counter()
+        manifest = generate_activity_sharded(args.output_dir, args.shards, args.seed, args.format,
+                                             args.workers, args.chunk_size)
+        seconds = time.perf_counter() - started
+        print(f"{args.output_dir}: {manifest['rows']} rows in {args.shards} shards in {seconds:.2f}s "
+              f"({manifest['rows'] / seconds:,.0f} rows/s)")
+    elif args.engine == 'numpy':
+        rng = np.random.default_rng(args.seed)
+        chunks = itertools.chain.from_iterable(
+            iter_activity_columns(START_DATE, END_DATE, activity_type, rng, frequency,
+                                  chunk_size=args.chunk_size)
+            for activity_type, frequency in [('calendar_month', 'monthly'), ('rolling_30d', 'daily')]
+        )
+
+        output = args.output or output_path('users_activity', args.format)
+        write_chunks(chunks, open_sink(args.format, output, CSV_HEADER))
+    else:
+        if args.seed is not None:
+            random.seed(args.seed)
+
+        # calendar_month rows first, then rolling_30d, as before
+        chunks = itertools.chain.from_iterable(
+            iter_activity_data(dates, activity_type, args.chunk_size)
+            for activity_type, dates in activity_grids()
+        )
+
+        output = args.output or output_path('users_activity', args.format)
+        write_chunks(chunks, open_sink(args.format, output, CSV_HEADER))
\ No newline at end of file
@@ -0,0 +1,161 @@
+import argparse
+import random
+import time
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+import sliding_window
+
+# Batch versions of the sliding_window.py algorithms for whole NumPy arrays. Every kernel
+# returns one value per full window (n - k + 1 values, an empty array when k > n) without a
+# Python-level loop over elements.
+
+
+def _check_k(k):
+    if k < 1:
+        raise ValueError(f"Window size must be at least 1, got {k}")
+
+
+def rolling_sum(a, k):
+    """Window sums from one cumulative sum: c[i + k] - c[i]
+
+    Exact for integers; for floats, differences of a long running total lose precision.
+    """
+    _check_k(k)
+    a = np.asarray(a)
+    if k > len(a):
+        return a[:0].copy()
+    totals = np.concatenate([np.zeros(1, dtype=a.dtype), np.cumsum(a)])
+    return totals[k:] - totals[:-k]
+
+
+def rolling_mean(a, k):
+    return rolling_sum(a, k) / k
+
+
+def _van_herk_gil_werman(a, k, ufunc):
+    """Rolling ufunc.reduce (maximum/minimum) in O(n) for any k
+
+    The array is cut into blocks of k. Each window [i, i + k - 1] spans at most two blocks,
+    so its result is ufunc(suffix scan of i's block at i, prefix scan of the next block at
+    i + k - 1). Padding only ever lands in the unused tail of those scans.
+    """
+    n = len(a)
+    blocks = -(-n // k)
+    padded = np.pad(a, (0, blocks * k - n), mode='edge').reshape(blocks, k)
+    prefix = ufunc.accumulate(padded, axis=1).ravel()
+    suffix = ufunc.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+    return ufunc(suffix[:n - k + 1], prefix[k - 1:n])
+
+
+def rolling_max(a, k, method='van_herk'):
+    """Window maxima; method='view' reduces a sliding_window_view instead (O(n*k), fine for small k)"""
+    _check_k(k)
+    a = np.asarray(a)
+    if k > len(a):
+        return a[:0].copy()
+    if method == 'view':
+        return sliding_window_view(a, k).max(axis=1)
+    return _van_herk_gil_werman(a, k, np.maximum)
+
+
+def rolling_min(a, k, method='van_herk'):
+    _check_k(k)
+    a = np.asarray(a)
+    if k > len(a):
+        return a[:0].copy()
+    if method == 'view':
+        return sliding_window_view(a, k).min(axis=1)
+    return _van_herk_gil_werman(a, k, np.minimum)
+
+
+def rolling_distinct(a, k):
+    """Distinct values per window in O(n log n), independent of k
+
+    Element j is the first copy of its value in every window starting after the previous
+    equal element prev[j], so it adds 1 to windows max(prev[j] + 1, j - k + 1)..min(j, n - k).
+    Those ranges go into a difference array whose cumulative sum is the answer.
+    """
+    _check_k(k)
+    a = np.asarray(a)
+    n = len(a)
+    if k > n:
+        return np.zeros(0, dtype=np.int64)
+
+    order = np.argsort(a, kind='stable')
+    sorted_values = a[order]
+    prev = np.full(n, -1, dtype=np.int64)
+    same = sorted_values[1:] == sorted_values[:-1]
+    prev[order[1:][same]] = order[:-1][same]
+
+    j = np.arange(n)
+    first = np.maximum(prev + 1, j - k + 1)
+    last = np.minimum(j, n - k)
+    valid = first <= last
+    diff = np.bincount(first[valid], minlength=n - k + 2) - np.bincount(last[valid] + 1, minlength=n - k + 2)
+    return np.cumsum(diff)[:n - k + 1]
+
+
+def check_against_reference(cases=2000, seed=0):
+    """Compare every kernel with sliding_window.py on random small arrays and the file's examples
+
+    Covers k > n (e.g. the k = 12 example over 7 numbers), k == n, k == 1 and empty input.
+    Raises AssertionError on the first mismatch.
+    """
+    rng = random.Random(seed)
+    examples = [([1, 5, 7, 3, 6, 9, 2], 12), ([1, 4, 5, 3, 2, 7, 3, 3, 6], 3),
+                ([1, 3, -1, -3, 5, 3, 6, 7], 3), ([], 1), ([4], 1), ([2, 2, 2], 3)]
+    for _ in range(cases):
+        n = rng.randint(0, 40)
+        examples.append(([rng.randint(-9, 9) for _ in range(n)], rng.randint(1, 45)))
+
+    for nums, k in examples:
+        a = np.array(nums, dtype=np.int64)
+        positive = np.abs(a) + 1
+        expected_max = sliding_window.max_sliding_window(nums, k)
+        checks = {
+            'sum': (int(rolling_sum(positive, k).max(initial=0)),
+                    sliding_window.max_sum_subarray(positive.tolist(), k)),
+            'max': (rolling_max(a, k).tolist(), expected_max),
+            'max view': (rolling_max(a, k, method='view').tolist(), expected_max),
+            'min': (rolling_min(a, k).tolist(), [-x for x in sliding_window.max_sliding_window([-x for x in nums], k)]),
+            'min view': (rolling_min(a, k, method='view').tolist(), rolling_min(a, k).tolist()),
+            'mean': (rolling_mean(a, k).tolist(), [sum(nums[i:i + k]) / k for i in range(len(nums) - k + 1)]),
+            'distinct': (rolling_distinct(a, k).tolist(), sliding_window.unique_in_windows(nums, k)),
+        }
+        for name, (result, expected) in checks.items():
+            if result != expected:
+                raise AssertionError(f"{name} mismatch for nums={nums} k={k}: {result} != {expected}")
+    return len(examples)
+
+
+def benchmark(n=5_000_000, k=1000, seed=0):
+    """Seconds per kernel on n random integers"""
+    a = np.random.default_rng(seed).integers(0, 10 * k, n)
+    kernels = {
+        'sum': lambda: rolling_sum(a, k),
+        'mean': lambda: rolling_mean(a, k),
+        'max': lambda: rolling_max(a, k),
+        'min': lambda: rolling_min(a, k),
+        'distinct': lambda: rolling_distinct(a, k),
+    }
+    timings = {}
+    print(f"n={n} k={k}")
+    for name, kernel in kernels.items():
+        started = time.perf_counter()
+        kernel()
+        timings[name] = time.perf_counter() - started
+        print(f"{name:<10}{timings[name]:>8.3f}s")
+    return timings
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Check and time NumPy sliding-window kernels")
+    parser.add_argument('--n', type=int, default=5_000_000)
+    parser.add_argument('--k', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{check_against_reference(seed=args.seed)} cases match sliding_window.py")
+    benchmark(args.n, args.k, args.seed)
@@ -0,0 +1,234 @@
+import argparse
+import heapq
+import itertools
+import random
+import time
+from collections import Counter, deque
+
+import sliding_window
+
+# Streaming versions of the sliding_window.py algorithms. Each operator takes any iterable,
+# keeps only what the current window needs and yields one result per full window (or per
+# element for the min-length scan), so they run over unbounded input in O(k) memory with
+# amortised O(1) or O(log k) work per element.
+
+
+# 1. Window sums: running total, add the entering element and subtract the leaving one
+def window_sums(iterable, k):
+    window = deque()
+    total = 0
+    for x in iterable:
+        window.append(x)
+        total += x
+        if len(window) > k:
+            total -= window.popleft()
+        if len(window) == k:
+            yield total
+
+
+def max_window_sum(iterable, k):
+    """sliding_window.max_sum_subarray over a stream (0 when there is no full window)"""
+    return max(window_sums(iterable, k), default=0)
+
+
+# 2. Smallest subarray with sum >= target: two pointers over positive numbers
+def min_length_with_sum(iterable, target):
+    """Yield the best length found so far (0 = none yet) after each element
+
+    Once a length L is known, elements that would only make windows of L or more are
+    dropped, so memory is bounded by the answer; before that the whole prefix is kept.
+    """
+    window = deque()
+    total = 0
+    best = 0
+    for x in iterable:
+        window.append(x)
+        total += x
+        while window and total >= target:
+            best = len(window) if not best else min(best, len(window))
+            total -= window.popleft()
+        while best and len(window) >= best:
+            total -= window.popleft()
+        yield best
+
+
+def smallest_subarray_len(iterable, target):
+    """sliding_window.smallest_subarray_len over a stream"""
+    best = 0
+    for best in min_length_with_sum(iterable, target):
+        pass
+    return best
+
+
+# 3. Distinct elements per window: hashmap of counts, a key disappears when its count hits 0
+def window_distinct_counts(iterable, k):
+    window = deque()
+    counts = Counter()
+    for x in iterable:
+        window.append(x)
+        counts[x] += 1
+        if len(window) > k:
+            old = window.popleft()
+            counts[old] -= 1
+            if not counts[old]:
+                del counts[old]
+        if len(window) == k:
+            yield len(counts)
+
+
+# 4. Window median: two heaps with lazy deletion
+class _DualHeap:
+    """Lower half in a max-heap (negated), upper half in a min-heap
+
+    Removed values are only counted in `delayed` and popped once they reach a heap top.
+    small_size/large_size count live values; compact() drops the buried dead ones.
+    """
+
+    def __init__(self):
+        self.small = []
+        self.large = []
+        self.delayed = Counter()
+        self.small_size = 0
+        self.large_size = 0
+
+    def _prune(self, heap, sign):
+        while heap and self.delayed[sign * heap[0]]:
+            value = sign * heapq.heappop(heap)
+            self.delayed[value] -= 1
+            if not self.delayed[value]:
+                del self.delayed[value]
+
+    def _balance(self):
+        if self.small_size > self.large_size + 1:
+            heapq.heappush(self.large, -heapq.heappop(self.small))
+            self.small_size -= 1
+            self.large_size += 1
+            self._prune(self.small, -1)
+        elif self.small_size < self.large_size:
+            heapq.heappush(self.small, -heapq.heappop(self.large))
+            self.large_size -= 1
+            self.small_size += 1
+            self._prune(self.large, 1)
+
+    def add(self, x):
+        if not self.small or x <= -self.small[0]:
+            heapq.heappush(self.small, -x)
+            self.small_size += 1
+        else:
+            heapq.heappush(self.large, x)
+            self.large_size += 1
+        self._balance()
+
+    def remove(self, x):
+        self.delayed[x] += 1
+        if x <= -self.small[0]:
+            self.small_size -= 1
+            if x == -self.small[0]:
+                self._prune(self.small, -1)
+        else:
+            self.large_size -= 1
+            if x == self.large[0]:
+                self._prune(self.large, 1)
+        self._balance()
+
+    def compact(self, window):
+        """Rebuild both heaps from the live window values"""
+        values = sorted(window)
+        middle = (len(values) + 1) // 2
+        self.small = [-x for x in reversed(values[:middle])]
+        self.large = values[middle:]
+        self.delayed.clear()
+        self.small_size = len(self.small)
+        self.large_size = len(self.large)
+
+    def __len__(self):
+        return len(self.small) + len(self.large)
+
+    def median(self):
+        if self.small_size > self.large_size:
+            return -self.small[0]
+        return (-self.small[0] + self.large[0]) / 2
+
+
+def window_medians(iterable, k):
+    window = deque()
+    heaps = _DualHeap()
+    for x in iterable:
+        window.append(x)
+        heaps.add(x)
+        if len(window) > k:
+            heaps.remove(window.popleft())
+            if len(heaps) > 2 * k:
+                heaps.compact(window)  # keeps dead entries from piling up
+        if len(window) == k:
+            yield heaps.median()
+
+
+# 5. Window maximum: deque of (index, value) with decreasing values; the front is the max
+def window_maxima(iterable, k):
+    candidates = deque()
+    for i, x in enumerate(iterable):
+        while candidates and candidates[-1][1] <= x:
+            candidates.pop()
+        candidates.append((i, x))
+        if candidates[0][0] <= i - k:
+            candidates.popleft()
+        if i >= k - 1:
+            yield candidates[0][1]
+
+
+def _timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def benchmark(n=20_000, k=500, seed=0):
+    """Time the sliding_window.py loops against the streaming operators on the same data
+
+    Results must match exactly; returns {operation: (reference_seconds, stream_seconds)}.
+    """
+    rng = random.Random(seed)
+    positive = [rng.randint(1, 100) for _ in range(n)]
+    signed = [rng.randint(-1000, 1000) for _ in range(n)]
+    labels = [rng.randint(0, k) for _ in range(n)]
+    target = 50 * k  # typical answer around k elements
+
+    cases = {
+        'max_sum': (lambda: sliding_window.max_sum_subarray(positive, k),
+                    lambda: max_window_sum(iter(positive), k)),
+        'min_length': (lambda: sliding_window.smallest_subarray_len(positive, target),
+                       lambda: smallest_subarray_len(iter(positive), target)),
+        'distinct': (lambda: sliding_window.unique_in_windows(labels, k),
+                     lambda: list(window_distinct_counts(iter(labels), k))),
+        'median': (lambda: sliding_window.median_sliding_window(signed, k),
+                   lambda: list(window_medians(iter(signed), k))),
+        'max': (lambda: sliding_window.max_sliding_window(signed, k),
+                lambda: list(window_maxima(iter(signed), k))),
+    }
+
+    timings = {}
+    print(f"n={n} k={k}")
+    print(f"{'operation':<12}{'reference s':>14}{'stream s':>12}{'speedup':>10}")
+    for name, (reference, stream) in cases.items():
+        expected, reference_seconds = _timed(reference)
+        result, stream_seconds = _timed(stream)
+        if result != expected:
+            raise AssertionError(f"{name}: streaming result differs from sliding_window.py")
+        timings[name] = (reference_seconds, stream_seconds)
+        print(f"{name:<12}{reference_seconds:>14.3f}{stream_seconds:>12.3f}"
+              f"{reference_seconds / stream_seconds:>9.0f}x")
+    return timings
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark streaming window operators")
+    parser.add_argument('--n', type=int, default=20_000)
+    parser.add_argument('--k', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    benchmark(args.n, args.k, args.seed)
+
+    # The operators only pull from the iterator, so they also run on endless input
+    print(list(itertools.islice(window_maxima(itertools.count(), 3), 5)))
@@ -0,0 +1,8 @@
+import os
+import sys
+import tempfile
+
+# Let tests import the top-level scripts, and keep Airflow's home out of the user's directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('AIRFLOW_HOME', tempfile.mkdtemp(prefix='airflow-home-'))
+os.environ.setdefault('AIRFLOW__CORE__LOAD_EXAMPLES', 'False')
@@ -0,0 +1,33 @@
+"""Sharded generation writes the same bytes whatever the number of worker processes"""
+import os
+
+import pytest
+
+pytest.importorskip('numpy')
+
+import chatAI_payments  # noqa: E402
+import chatAI_users_activity  # noqa: E402
+
+GENERATORS = {
+    'payments': lambda output_dir, workers: chatAI_payments.generate_payments_sharded(
+        output_dir, 4, num_records=20_000, num_subscriptions=2_000, seed=11, workers=workers, chunk_size=3_000),
+    'users_activity': lambda output_dir, workers: chatAI_users_activity.generate_activity_sharded(
+        output_dir, 4, seed=11, workers=workers, chunk_size=3_000),
+}
+
+
+def read_files(directory):
+    return {name: (directory / name).read_bytes() for name in sorted(os.listdir(directory))}
+
+
+@pytest.mark.parametrize('dataset', sorted(GENERATORS))
+def test_one_and_many_workers_write_identical_files_and_manifests(tmp_path, dataset):
+    single = GENERATORS[dataset](tmp_path / 'single', 1)
+    pooled = GENERATORS[dataset](tmp_path / 'pooled', 3)
+
+    assert pooled == single
+    files = read_files(tmp_path / 'single')
+    assert f"{dataset}.manifest.json" in files
+    assert len(files) == 4 + 1
+    assert read_files(tmp_path / 'pooled') == files
+    assert single['rows'] == sum(shard['rows'] for shard in single['shards']) > 0
@@ -0,0 +1,21 @@
+"""sliding_window_batch.py kernels against the sliding_window.py loops"""
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import sliding_window_batch  # noqa: E402
+
+
+def test_kernels_match_reference():
+    # 6 fixed examples (k > n, k == n, k == 1, empty input) plus random small arrays
+    assert sliding_window_batch.check_against_reference(cases=500) == 506
+
+
+def test_kernels_with_window_longer_than_input():
+    a = np.array([1, 5, 7, 3, 6, 9, 2])  # the k = 12 example in sliding_window.py
+    for kernel in (sliding_window_batch.rolling_sum, sliding_window_batch.rolling_mean,
+                   sliding_window_batch.rolling_max, sliding_window_batch.rolling_min,
+                   sliding_window_batch.rolling_distinct):
+        assert kernel(a, 12).tolist() == []
+    with pytest.raises(ValueError):
+        sliding_window_batch.rolling_sum(a, 0)
@@ -0,0 +1,39 @@
+"""sliding_window_stream.py operators against the sliding_window.py loops"""
+import itertools
+import random
+
+import pytest
+
+import sliding_window
+import sliding_window_stream as stream
+
+
+def random_cases(count=300, seed=0):
+    """(nums, k) pairs including k > n, k == n, k == 1 and empty input"""
+    rng = random.Random(seed)
+    cases = [([1, 5, 7, 3, 6, 9, 2], 12), ([1, 4, 5, 3, 2, 7, 3, 3, 6], 3), ([], 1), ([4], 1), ([2, 2, 2], 3)]
+    for _ in range(count):
+        n = rng.randint(0, 30)
+        cases.append(([rng.randint(-9, 9) for _ in range(n)], rng.randint(1, 35)))
+    return cases
+
+
+@pytest.mark.parametrize('nums, k', random_cases())
+def test_operators_match_reference(nums, k):
+    positive = [abs(x) + 1 for x in nums]
+
+    assert stream.max_window_sum(iter(positive), k) == sliding_window.max_sum_subarray(positive, k)
+    assert stream.smallest_subarray_len(iter(positive), 3 * k) == sliding_window.smallest_subarray_len(positive, 3 * k)
+    assert list(stream.window_distinct_counts(iter(nums), k)) == sliding_window.unique_in_windows(nums, k)
+    assert list(stream.window_medians(iter(nums), k)) == sliding_window.median_sliding_window(nums, k)
+    assert list(stream.window_maxima(iter(nums), k)) == sliding_window.max_sliding_window(nums, k)
+
+
+def test_benchmark_results_match_reference():
+    # benchmark() raises when a streaming result differs from sliding_window.py
+    timings = stream.benchmark(n=2_000, k=50)
+    assert sorted(timings) == ['distinct', 'max', 'max_sum', 'median', 'min_length']
+
+
+def test_operators_run_on_endless_input():
+    assert list(itertools.islice(stream.window_maxima(itertools.count(), 3), 5)) == [2, 3, 4, 5, 6]
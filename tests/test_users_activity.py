@@ -0,0 +1,96 @@
+"""Activity rollups derived from payment events in chatAI_users_activity.py"""
+from datetime import date, timedelta
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import chatAI_payments  # noqa: E402
+import chatAI_users_activity as activity  # noqa: E402
+
+
+def derive(payment_rows, **kwargs):
+    return [row for rows in activity.derive_activity_data(iter(payment_rows), **kwargs) for row in rows]
+
+
+def test_subscription_paying_across_a_skipped_month_is_active_in_it():
+    # A 30-day cycle pays on 2025-01-31 and 2025-03-02, with no event in February
+    payment_dates = ['2025-01-01', '2025-01-31', '2025-03-02', '2025-04-01']
+    rows = derive([[i, 7, 1, 1, '2024-12-02', '', 0, day] for i, day in enumerate(payment_dates)])
+    active = {(row[0], row[1]): row[4] for row in rows if row[2:4] == (1, 1)}
+
+    assert active[('2025-02-01', 'calendar_month')] == 1
+    assert active[('2025-02-28', 'rolling_30d')] == 1
+    # Churns on 2025-05-01, 30 days after the last payment, so it is gone for May
+    assert active[('2025-04-01', 'calendar_month')] == 1
+    assert active[('2025-05-01', 'calendar_month')] == 0
+    may = next(row for row in rows if row[:4] == ('2025-05-01', 'calendar_month', 1, 1))
+    assert may[6] == 1
+
+
+def test_rollups_match_intervals_counted_by_brute_force():
+    columns = chatAI_payments.generate_payments_schedule(3000, 800, seed=3, churn_rate=0.1)
+    payment_rows = [list(map(str, row)) for row in chatAI_payments.format_payment_rows(columns)]
+
+    # Each subscription's [start, churn) from its rows, as collect_activity_events documents
+    subscriptions = {}
+    for _, subscription_id, product_id, country_id, sub_start, sub_end, _, payment_date in payment_rows:
+        key = (int(product_id), int(country_id))
+        start, last = date.fromisoformat(sub_start), date.fromisoformat(payment_date)
+        end = date.fromisoformat(sub_end) if sub_end else None
+        _, _, _, previous = subscriptions.get(subscription_id, (key, start, end, last))
+        subscriptions[subscription_id] = (key, start, end, max(last, previous))
+    intervals = [(key, start, end or last + timedelta(days=activity.ACTIVITY_WINDOW_DAYS))
+                 for key, start, end, last in subscriptions.values()]
+
+    first_day, last_day = activity.START_DATE.date(), activity.END_DATE.date()
+
+    def expected(key, window_first, window_last):
+        data_first = max(window_first, first_day)
+        return (
+            sum(k == key and start <= window_last and churn > window_first for k, start, churn in intervals),
+            sum(k == key and data_first <= start <= window_last for k, start, _ in intervals),
+            sum(k == key and data_first <= churn <= window_last for k, _, churn in intervals),
+        )
+
+    rows = derive(payment_rows, chunk_size=97)
+    assert len(rows) == (17 + 516) * len(activity.PRODUCT_IDS) * len(activity.COUNTRY_IDS)
+    for row in rows[::37]:
+        day, activity_type, *key = row[:4]
+        window_last = window_first = date.fromisoformat(day)
+        if activity_type == 'rolling_30d':
+            window_first = window_last - timedelta(days=activity.ACTIVITY_WINDOW_DAYS - 1)
+        else:
+            following = (window_first.replace(day=28) + timedelta(days=4)).replace(day=1)
+            window_last = min(following - timedelta(days=1), last_day)
+        assert tuple(row[4:]) == expected(tuple(key), window_first, window_last), row
+
+
+def test_cross_join_rows_follow_date_product_country_order():
+    dates = activity.calendar_dates(date(2024, 1, 30), date(2024, 2, 2))
+    grid = activity.cross_join(dates, [4, 2], [9, 1, 5])
+    rows = list(zip(activity.row_dates(grid).tolist(), grid['product_id'].tolist(), grid['country_id'].tolist()))
+
+    labels = ['2024-01-30', '2024-01-31', '2024-02-01', '2024-02-02']
+    assert rows == [(day, product, country) for day in labels for product in [4, 2] for country in [9, 1, 5]]
+    assert grid['date_labels'].tolist() == labels
+
+    part = activity.cross_join(dates, [4, 2], [9, 1, 5], start=5, stop=14)
+    assert list(zip(activity.row_dates(part).tolist(), part['product_id'].tolist(),
+                    part['country_id'].tolist())) == rows[5:14]
+
+
+@pytest.mark.parametrize('frequency', ['daily', 'weekly', 'monthly', 'iso_week'])
+def test_iter_activity_columns_streams_wide_grids_in_bounded_chunks(frequency):
+    product_ids, country_ids = list(range(7)), list(range(300))
+    dates = activity.calendar_dates(date(2024, 1, 1), date(2024, 3, 31), frequency)
+    chunks = list(activity.iter_activity_columns(date(2024, 1, 1), date(2024, 3, 31), 'rolling_30d',
+                                                 np.random.default_rng(0), frequency, product_ids,
+                                                 country_ids, chunk_size=1000))
+
+    assert all(len(chunk) <= 1000 for chunk in chunks)
+    rows = [row for chunk in chunks for row in chunk]
+    keys_per_date = len(product_ids) * len(country_ids)
+    assert len(rows) == len(dates) * keys_per_date
+    assert [row[0] for row in rows[::keys_per_date]] == np.datetime_as_string(dates).tolist()
+    assert [row[2:4] for row in rows[:keys_per_date]] == [(p, c) for p in product_ids for c in country_ids]
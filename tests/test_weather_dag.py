@@ -0,0 +1,70 @@
+"""Parse the weather DAG the way the scheduler does and check its task graph"""
+import pytest
+
+pytest.importorskip('airflow')
+pytest.importorskip('google.cloud.bigquery')
+
+import json  # noqa: E402
+import subprocess  # noqa: E402
+import sys  # noqa: E402
+from pathlib import Path  # noqa: E402
+
+from airflow.models import DagBag  # noqa: E402
+from airflow.models.mappedoperator import MappedOperator  # noqa: E402
+
+from weather_benchmarks import _PARSE_SNIPPET  # noqa: E402
+
+DAG_FILE = Path(__file__).resolve().parent.parent / 'weather_bigquery_dag.py'
+DAG_ID = 'weather_data_bigquery_pipeline'
+
+
+def parse_dag(tmp_path, shard_count):
+    """Copy the DAG file with CONFIG['shard_count'] set and load it through a DagBag"""
+    source = DAG_FILE.read_bytes().decode()
+    default = "'shard_count': 1,"
+    assert source.count(default) == 1
+    (tmp_path / DAG_FILE.name).write_text(source.replace(default, f"'shard_count': {shard_count},"))
+
+    dagbag = DagBag(dag_folder=str(tmp_path), include_examples=False)
+    assert dagbag.import_errors == {}
+    return dagbag.dags[DAG_ID]
+
+
+def test_unsharded_dag_is_a_plain_chain(tmp_path):
+    dag = parse_dag(tmp_path, 1)
+
+    assert not any(isinstance(task, MappedOperator) for task in dag.tasks)
+    assert dag.get_task('extract_weather_data').downstream_task_ids == {'transform_data'}
+
+
+def test_sharded_dag_maps_extract_and_transform_and_fans_in(tmp_path):
+    dag = parse_dag(tmp_path, 3)
+
+    extract = dag.get_task('extract_weather_data')
+    transform = dag.get_task('transform_data')
+    quality_check = dag.get_task('data_quality_check')
+    load = dag.get_task('load_to_bigquery')
+
+    assert isinstance(extract, MappedOperator)
+    assert isinstance(transform, MappedOperator)
+    assert [kwargs['shard_index'] for kwargs in extract.expand_input.value['op_kwargs']] == [0, 1, 2]
+    assert not isinstance(quality_check, MappedOperator)
+    assert not isinstance(load, MappedOperator)
+
+    # One task id each, so every shard of transform feeds the same single quality check and load
+    assert sorted(task.task_id for task in dag.tasks) == sorted(
+        ['extract_weather_data', 'transform_data', 'data_quality_check', 'load_to_bigquery', 'notify_success'])
+    assert extract.downstream_task_ids == {'transform_data'}
+    assert transform.downstream_task_ids == {'data_quality_check'}
+    assert quality_check.upstream_task_ids == {'transform_data'}
+    assert quality_check.downstream_task_ids == {'load_to_bigquery'}
+    assert load.downstream_task_ids == {'notify_success'}
+
+
+def test_parsing_the_dag_imports_no_heavy_modules():
+    # A fresh interpreter, as the scheduler's DAG processor uses, so this test's imports don't count
+    output = subprocess.run([sys.executable, '-c', _PARSE_SNIPPET], cwd=DAG_FILE.parent,
+                            check=True, capture_output=True, text=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+
+    assert result['heavy_modules'] == []
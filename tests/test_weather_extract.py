@@ -0,0 +1,75 @@
+"""Concurrent extraction against the local Open-Meteo stub from weather_benchmarks"""
+import pytest
+
+pytest.importorskip('airflow')
+pytest.importorskip('requests')
+pytest.importorskip('numpy')
+
+from weather_benchmarks import StubWeatherServer, make_cities  # noqa: E402
+from weather_bigquery_dag import CONFIG, WeatherDataPipeline  # noqa: E402
+
+
+def extract(server, concurrency, batch_size, columnar):
+    config = dict(CONFIG, max_concurrency=concurrency, batch_size=batch_size, requests_per_second=1e6,
+                  burst=concurrency, incremental=False, use_cache=False, columnar=columnar)
+    pipeline = WeatherDataPipeline(config)
+    pipeline.cities = make_cities(12)
+    pipeline.base_url = server.url
+    try:
+        return pipeline.extract_weather_data(days_back=2)
+    finally:
+        pipeline.close()
+
+
+def without_extracted_at(data):
+    """extracted_at is the wall-clock time of the request, so it differs between runs"""
+    if isinstance(data, dict):
+        return {name: values for name, values in data.items() if name != 'extracted_at'}
+    return [{key: value for key, value in record.items() if key != 'extracted_at'} for record in data]
+
+
+@pytest.mark.parametrize('columnar', [False, True])
+@pytest.mark.parametrize('batch_size', [1, 5])
+def test_concurrent_extract_matches_sequential(columnar, batch_size):
+    with StubWeatherServer(latency=0.01) as server:
+        sequential = extract(server, 1, batch_size, columnar)
+        sequential_requests = server.requests
+        concurrent = extract(server, 4, batch_size, columnar)
+        concurrent_requests = server.requests - sequential_requests
+
+    assert WeatherDataPipeline.count_records(sequential) == 12 * 3 * 24
+    assert without_extracted_at(concurrent) == without_extracted_at(sequential)
+    assert concurrent_requests == sequential_requests == -(-12 // batch_size)
+
+
+def test_incremental_runs_load_each_observed_hour_once(tmp_path):
+    from weather_benchmarks import FakeBigQueryClient
+
+    config = dict(CONFIG, max_concurrency=2, batch_size=5, requests_per_second=1e6, burst=2,
+                  use_cache=False, incremental=True, write_mode='append', load_format='csv',
+                  watermark_path=str(tmp_path / 'watermarks.json'),
+                  load_checkpoint_dir=str(tmp_path / 'checkpoints'))
+    client = FakeBigQueryClient()
+    loaded = []
+
+    with StubWeatherServer() as server:
+        for _ in range(2):
+            pipeline = WeatherDataPipeline(config)
+            pipeline.cities = make_cities(6)
+            pipeline.base_url = server.url
+            pipeline._get_bigquery_client = lambda: client
+            try:
+                raw = pipeline.extract_weather_data(days_back=2)
+            finally:
+                pipeline.close()
+            if not pipeline.count_records(raw):
+                continue
+            df = pipeline.transform_data(raw)
+            pipeline.load_to_bigquery(df)
+            pipeline.update_watermarks(df)
+            loaded.extend(zip(df['city'], df['timestamp'].dt.strftime('%Y-%m-%dT%H:%M')))
+
+    # The stub answers whole days, forecast hours included; none of them may be appended
+    assert loaded
+    assert max(timestamp for _, timestamp in loaded) <= WeatherDataPipeline.last_observed_hour()
+    assert len(loaded) == len(set(loaded))
@@ -0,0 +1,201 @@
+"""MERGE upsert semantics of the weather pipeline, run on duckdb in place of BigQuery"""
+import io
+import re
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip('airflow')
+duckdb = pytest.importorskip('duckdb')
+pytest.importorskip('google.cloud.bigquery')
+pytest.importorskip('pyarrow')
+
+import weather_bigquery_dag as w  # noqa: E402
+
+TABLE_ID = 'proj.weather.hourly'
+DUCKDB_TYPES = {
+    'STRING': 'VARCHAR',
+    'TIMESTAMP': 'TIMESTAMPTZ',
+    'FLOAT64': 'DOUBLE',
+    'DATE': 'DATE',
+    'INTEGER': 'BIGINT',
+}
+
+
+class DuckDBJob:
+    errors = None
+    output_rows = 0
+
+    def __init__(self, num_dml_affected_rows=0):
+        self.num_dml_affected_rows = num_dml_affected_rows
+
+    def result(self):
+        return self
+
+
+class DuckDBClient:
+    """The bigquery.Client calls load_to_bigquery makes, backed by an in-memory duckdb"""
+
+    def __init__(self):
+        self.con = duckdb.connect()
+        self.con.execute("SET TimeZone = 'UTC'")
+        self.created = []
+        self.loads = []
+        self.queries = []
+        self.deleted = []
+
+    @staticmethod
+    def _name(table_id):
+        return f'"{table_id}"'
+
+    def create_table(self, table, exists_ok=False):
+        columns = ', '.join(f"{field.name} {DUCKDB_TYPES[field.field_type]}" for field in table.schema)
+        table_id = f"{table.project}.{table.dataset_id}.{table.table_id}"
+        self.created.append(table_id)
+        self.con.execute(f"CREATE TABLE IF NOT EXISTS {self._name(table_id)} ({columns})")
+        return table
+
+    def load_table_from_file(self, file_obj, table_id, job_config=None, rewind=False):
+        import pyarrow.parquet as pq
+
+        if rewind:
+            file_obj.seek(0)
+        arrow_table = pq.read_table(io.BytesIO(file_obj.read()))
+        self.loads.append((table_id, job_config.write_disposition, arrow_table.num_rows))
+        if job_config.write_disposition == w.bigquery.WriteDisposition.WRITE_TRUNCATE:
+            self.con.execute(f"CREATE OR REPLACE TABLE {self._name(table_id)} AS SELECT * FROM arrow_table")
+        else:
+            self.con.execute(f"CREATE TABLE IF NOT EXISTS {self._name(table_id)} AS SELECT * FROM arrow_table LIMIT 0")
+            self.con.execute(f"INSERT INTO {self._name(table_id)} SELECT * FROM arrow_table")
+        return DuckDBJob()
+
+    def query(self, query, job_config=None):
+        self.queries.append(query)
+        # BigQuery dialect -> duckdb: backtick identifiers, optional INTO, named parameters
+        sql = re.sub(r'\bMERGE\s+`', 'MERGE INTO `', query).replace('`', '"')
+        for parameter in getattr(job_config, 'query_parameters', []):
+            sql = sql.replace(f"@{parameter.name}", f"DATE '{parameter.value.isoformat()}'")
+        affected = self.con.execute(sql).fetchall()
+        return DuckDBJob(affected[0][0] if affected else 0)
+
+    def delete_table(self, table_id, not_found_ok=False):
+        self.deleted.append(table_id)
+        self.con.execute(f"DROP TABLE {'IF EXISTS ' if not_found_ok else ''}{self._name(table_id)}")
+
+    def rows(self, table_id=TABLE_ID):
+        return self.con.execute(
+            f"SELECT city, strftime(timestamp, '%Y-%m-%dT%H:%M'), temperature_celsius, extracted_at "
+            f"FROM {self._name(table_id)} ORDER BY 1, 2"
+        ).fetchall()
+
+    def tables(self):
+        return {row[0] for row in self.con.execute("SELECT table_name FROM duckdb_tables()").fetchall()}
+
+
+def make_pipeline(tmp_path, client, **overrides):
+    config = dict(w.CONFIG, table_id=TABLE_ID, write_mode='merge', load_format='parquet',
+                  load_checkpoint_dir=str(tmp_path / 'checkpoints'))
+    config.update(overrides)
+    pipeline = w.WeatherDataPipeline(config)
+    pipeline._get_bigquery_client = lambda: client
+    return pipeline
+
+
+def raw_hours(cities, first_hour, hours, temperature, extracted_at):
+    """Extract-shaped records for consecutive hours from 2024-01-01 00:00 + first_hour"""
+    start = datetime(2024, 1, 1)
+    records = []
+    for city in cities:
+        for h in range(first_hour, first_hour + hours):
+            records.append({
+                'city': city,
+                'timestamp': (start + timedelta(hours=h)).strftime('%Y-%m-%dT%H:%M'),
+                'temperature_celsius': temperature,
+                'humidity_percent': 80,
+                'precipitation_mm': 0.0,
+                'wind_speed_kmh': 10.0,
+                'wind_direction_degrees': 180,
+                'pressure_hpa': 1010.0,
+                'extracted_at': extracted_at,
+            })
+    return records
+
+
+def test_merge_sql_dedups_staging_updates_matches_and_inserts_new_rows(tmp_path):
+    client = DuckDBClient()
+    pipeline = make_pipeline(tmp_path, client)
+    pipeline.ensure_table(client, TABLE_ID)
+    schema = ', '.join(f"{field.name} {DUCKDB_TYPES[field.field_type]}" for field in pipeline.bq_schema)
+    client.con.execute(f'CREATE TABLE "staging" ({schema})')
+
+    columns = [field.name for field in pipeline.bq_schema]
+    insert = lambda table, rows: client.con.executemany(  # noqa: E731
+        f'INSERT INTO "{table}" ({", ".join(columns)}) VALUES ({", ".join("?" * len(columns))})', rows)
+
+    def row(city, hour, temperature, extracted_at):
+        timestamp = f"2024-01-01 {hour:02d}:00:00+00"
+        return [city, timestamp, temperature, 80.0, 0.0, 10.0, 180.0, 1010.0,
+                f"2024-01-0{extracted_at} 00:00:00+00", '2024-01-01', hour, 0, 1]
+
+    insert(TABLE_ID, [row('London', 0, 1.0, 1), row('London', 1, 1.0, 1)])
+    insert('staging', [
+        row('London', 1, 5.0, 2), row('London', 1, 9.0, 3),  # newest extracted_at must win
+        row('London', 2, 7.0, 2),
+    ])
+
+    client.query(pipeline.build_merge_sql('staging', TABLE_ID), job_config=w.bigquery.QueryJobConfig(
+        query_parameters=[
+            w.bigquery.ScalarQueryParameter('min_date', 'DATE', datetime(2024, 1, 1).date()),
+            w.bigquery.ScalarQueryParameter('max_date', 'DATE', datetime(2024, 1, 1).date()),
+        ]))
+
+    assert [(city, ts, temp) for city, ts, temp, _ in client.rows()] == [
+        ('London', '2024-01-01T00:00', 1.0),  # untouched
+        ('London', '2024-01-01T01:00', 9.0),  # updated from the latest staged copy
+        ('London', '2024-01-01T02:00', 7.0),  # inserted
+    ]
+
+
+def test_overlapping_reloads_upsert_without_duplicates(tmp_path):
+    client = DuckDBClient()
+    # Small chunks so the staging table is filled by several load jobs
+    pipeline = make_pipeline(tmp_path, client, load_chunk_rows=20, load_chunk_bytes=None)
+    cities = ['London', 'Leeds']
+
+    first = pipeline.transform_data(raw_hours(cities, 0, 48, 1.0, '2024-01-03T00:00:00'))
+    pipeline.load_to_bigquery(first)
+    assert len(client.rows()) == 2 * 48
+
+    # Second window overlaps the last 24 hours of the first and adds 24 new ones
+    second = pipeline.transform_data(raw_hours(cities, 24, 48, 2.0, '2024-01-04T00:00:00'))
+    pipeline.load_to_bigquery(second)
+
+    rows = client.rows()
+    keys = [(city, ts) for city, ts, _, _ in rows]
+    assert len(keys) == len(set(keys)) == 2 * 72
+    temperatures = {(city, ts): temp for city, ts, temp, _ in rows}
+    assert temperatures[('London', '2024-01-01T23:00')] == 1.0
+    assert temperatures[('London', '2024-01-02T00:00')] == 2.0  # overlap updated
+    assert temperatures[('Leeds', '2024-01-03T23:00')] == 2.0  # new hour inserted
+
+    # Reloading the same window again changes nothing
+    pipeline.load_to_bigquery(second)
+    assert client.rows() == rows
+
+    # Each load staged in chunks (first chunk truncates), merged, then dropped its staging table
+    staging_loads = [load for load in client.loads if load[0] != TABLE_ID]
+    assert staging_loads and all('_staging_' in table for table, _, _ in staging_loads)
+    assert staging_loads[0][1] == w.bigquery.WriteDisposition.WRITE_TRUNCATE
+    assert len(client.queries) == 3
+    assert client.tables() == {TABLE_ID}
+
+
+def test_append_loads_make_no_table_api_calls(tmp_path):
+    client = DuckDBClient()
+    pipeline = make_pipeline(tmp_path, client, write_mode='append')
+
+    pipeline.load_to_bigquery(pipeline.transform_data(raw_hours(['London'], 0, 24, 1.0, '2024-01-03T00:00:00')))
+
+    assert client.created == []
+    assert client.queries == []
+    assert len(client.rows()) == 24
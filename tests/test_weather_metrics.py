@@ -0,0 +1,23 @@
+"""Stage metrics recorded by WeatherDataPipeline"""
+import pytest
+
+pytest.importorskip('airflow')
+pytest.importorskip('pyarrow')
+
+from weather_benchmarks import make_raw_columns  # noqa: E402
+from weather_bigquery_dag import CONFIG, WeatherDataPipeline  # noqa: E402
+
+
+@pytest.mark.parametrize('xcom_mode', ['records', 'artifact'])
+def test_to_xcom_records_rows_and_payload_bytes(tmp_path, xcom_mode):
+    pipeline = WeatherDataPipeline(dict(CONFIG, xcom_mode=xcom_mode, artifact_dir=str(tmp_path)))
+    df = pipeline.transform_data(make_raw_columns(500))
+    pipeline.reset()
+
+    pipeline.to_xcom(df, 'run', 'transform_data')
+
+    stage = pipeline.metrics.summary()['serialise']
+    assert stage['calls'] == 1
+    assert stage['rows'] == len(df) > 0
+    assert stage['bytes'] > 0
+    assert 'process_peak_rss_mb' in stage
@@ -0,0 +1,340 @@
+"""Offline benchmarks for weather_bigquery_dag.py
+
+Run with:
+    python weather_benchmarks.py transform --rows 1000000
+    python weather_benchmarks.py pipeline --cities 200 --days-back 30 --concurrency 8
+    python weather_benchmarks.py parse --repeat 5
+
+The pipeline benchmark drives WeatherDataPipeline end to end against a local stub
+Open-Meteo server and a fake BigQuery client, so nothing leaves the machine. The stub
+server runs in the same process, so extract figures include its response generation;
+compare extract numbers between runs rather than against production.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from weather_bigquery_dag import CONFIG, HOURLY_FIELDS, WeatherDataPipeline, _peak_rss_mb
+
+
+def make_raw_columns(rows: int, seed: int = 0) -> dict:
+    """Synthetic extract output in the columnar shape, with some NaN temperatures and duplicates"""
+    rng = np.random.default_rng(seed)
+    hours_per_city = 24 * 365
+    n_cities = max(1, -(-rows // hours_per_city))
+
+    start = np.datetime64('2020-01-01T00:00')
+    offsets = np.arange(rows) % hours_per_city
+    # Repeat a slice of hours so drop-duplicates has real work to do
+    offsets[rows // 100:rows // 50] = offsets[:rows // 50 - rows // 100]
+    timestamps = np.datetime_as_string(start + offsets.astype('timedelta64[h]'), unit='m')
+
+    columns = {
+        'city': [f"City {i}" for i in (np.arange(rows) // hours_per_city) % n_cities],
+        'timestamp': timestamps.tolist(),
+    }
+    for column in HOURLY_FIELDS.values():
+        values = rng.normal(10, 5, rows)
+        values[rng.random(rows) < 0.01] = np.nan
+        columns[column] = values.tolist()
+    columns['extracted_at'] = [datetime.now().isoformat()] * rows
+    return columns
+
+
+def _time(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def benchmark_transform(rows: int = 1_000_000) -> None:
+    """Compare the legacy object-dtype transform with the typed one"""
+    raw = make_raw_columns(rows)
+
+    legacy = WeatherDataPipeline(dict(CONFIG, typed_transform=False))
+    typed = WeatherDataPipeline(dict(CONFIG, typed_transform=True))
+
+    legacy_df, legacy_seconds = _time(legacy.transform_data, raw)
+    typed_df, typed_seconds = _time(typed.transform_data, raw)
+
+    assert len(legacy_df) == len(typed_df), "Typed transform returned a different row count"
+
+    legacy_mb = legacy_df.memory_usage(deep=True).sum() / 1e6
+    typed_mb = typed_df.memory_usage(deep=True).sum() / 1e6
+    print(f"rows in: {rows}, rows out: {len(typed_df)}")
+    print(f"legacy: {legacy_seconds:.2f}s, {legacy_mb:.1f} MB")
+    print(f"typed:  {typed_seconds:.2f}s, {typed_mb:.1f} MB")
+    print(f"speedup: {legacy_seconds / typed_seconds:.1f}x, memory: {legacy_mb / typed_mb:.1f}x smaller")
+
+
+class StubWeatherServer:
+    """Local HTTP server that answers forecast requests like Open-Meteo
+
+    Returns a single object for one location and a list for comma-separated
+    latitude/longitude lists, with one value per hour in the requested date range.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                body = json.dumps(server.respond(parse_qs(urlparse(self.path).query))).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._httpd.server_port}/v1/forecast"
+
+    def respond(self, query: dict):
+        latitudes = query['latitude'][0].split(',')
+        start = date.fromisoformat(query['start_date'][0])
+        end = date.fromisoformat(query['end_date'][0])
+        hours = ((end - start).days + 1) * 24
+        times = [
+            (datetime.combine(start, datetime.min.time()) + timedelta(hours=h)).strftime('%Y-%m-%dT%H:%M')
+            for h in range(hours)
+        ]
+
+        locations = []
+        for i, latitude in enumerate(latitudes):
+            rng = np.random.default_rng(i)
+            locations.append({
+                'latitude': float(latitude),
+                'hourly': {
+                    'time': times,
+                    'temperature_2m': np.round(rng.normal(10, 5, hours), 1).tolist(),
+                    'relative_humidity_2m': rng.integers(30, 100, hours).tolist(),
+                    'precipitation': np.round(rng.exponential(0.2, hours), 1).tolist(),
+                    'wind_speed_10m': np.round(rng.gamma(2, 6, hours), 1).tolist(),
+                    'wind_direction_10m': rng.integers(0, 360, hours).tolist(),
+                    'pressure_msl': np.round(rng.normal(1013, 8, hours), 1).tolist(),
+                },
+            })
+        return locations[0] if len(locations) == 1 else locations
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+class FakeLoadJob:
+    errors = None
+    num_dml_affected_rows = 0
+
+    def __init__(self, output_rows: int = 0):
+        self.output_rows = output_rows
+
+    def result(self):
+        return self
+
+
+class FakeTable:
+    time_partitioning = True
+    clustering_fields = ['city']
+
+
+class FakeBigQueryClient:
+    """Stands in for bigquery.Client and keeps every load payload it receives"""
+
+    def __init__(self):
+        self.payloads = []
+        self.queries = []
+
+    def create_table(self, table, exists_ok=False):
+        return FakeTable()
+
+    def load_table_from_file(self, file_obj, table_id, job_config=None, rewind=False):
+        if rewind:
+            file_obj.seek(0)
+        payload = file_obj.read()
+        self.payloads.append((table_id, len(payload)))
+        return FakeLoadJob()
+
+    def query(self, query, job_config=None):
+        self.queries.append(query)
+        return FakeLoadJob()
+
+    def delete_table(self, table_id, not_found_ok=False):
+        pass
+
+
+def make_cities(n: int) -> dict:
+    """n distinct locations on a grid over Great Britain"""
+    side = int(np.ceil(np.sqrt(n)))
+    return {
+        f"City {i}": {
+            'lat': round(50.0 + 8.0 * (i // side) / side, 4),
+            'lon': round(-5.5 + 7.0 * (i % side) / side, 4),
+        }
+        for i in range(n)
+    }
+
+
+def _measure(name: str, results: dict, func, *args, **kwargs):
+    """Run one stage, recording wall time, its Python-heap peak and the process peak RSS
+
+    tracemalloc only sees Python allocations, not pyarrow's memory pool or other native
+    buffers, so process_peak_rss_mb is the number to compare for Arrow-heavy stages. RSS
+    peaks never reset, so it is the process high-water mark once the stage has finished.
+    """
+    tracemalloc.reset_peak()
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    results[name] = {
+        'seconds': time.perf_counter() - started,
+        'py_heap_peak_mb': tracemalloc.get_traced_memory()[1] / 1e6,
+        'process_peak_rss_mb': _peak_rss_mb(),
+    }
+    return result
+
+
+def benchmark_pipeline(cities: int = 50, days_back: int = 7, concurrency: int = 4,
+                       batch_size: int = 50, latency: float = 0.05, load_format: str = 'parquet') -> dict:
+    """Drive extract -> transform -> XCom artifact -> quality check -> load offline"""
+    work_dir = tempfile.mkdtemp(prefix='weather_bench_')
+    config = dict(
+        CONFIG,
+        max_concurrency=concurrency,
+        batch_size=batch_size,
+        requests_per_second=1e6,
+        burst=concurrency,
+        incremental=False,
+        use_cache=False,
+        load_format=load_format,
+        xcom_mode='artifact',
+        artifact_dir=f"{work_dir}/artifacts",
+        load_checkpoint_dir=f"{work_dir}/checkpoints",
+        metrics_textfile_dir=None,
+        statsd_host=None,
+        metrics_callback=None,
+    )
+    client = FakeBigQueryClient()
+    stages = {}
+
+    with StubWeatherServer(latency=latency) as server:
+        pipeline = WeatherDataPipeline(config)
+        pipeline.cities = make_cities(cities)
+        pipeline.base_url = server.url
+        pipeline._get_bigquery_client = lambda: client
+
+        tracemalloc.start()
+        try:
+            raw = _measure('extract', stages, pipeline.extract_weather_data, days_back=days_back)
+            pipeline.close()
+            raw_rows = pipeline.count_records(raw)
+            df = _measure('transform', stages, pipeline.transform_data, raw)
+            ref = _measure('serialise', stages, pipeline.to_xcom, df, 'benchmark', 'transform_data')
+            df = _measure('deserialise', stages, pipeline.from_xcom, ref)
+            _measure('quality_check', stages, pipeline.check_data_quality, df)
+            _measure('load', stages, pipeline.load_to_bigquery, df)
+        finally:
+            tracemalloc.stop()
+        requests_made = server.requests
+
+    rows = {'extract': raw_rows}
+    print(f"cities={cities} days_back={days_back} concurrency={concurrency} batch_size={batch_size} "
+          f"latency={latency}s requests={requests_made} rows={len(df)} "
+          f"load payload={sum(size for _, size in client.payloads) / 1e6:.1f} MB")
+    print(f"{'stage':<14}{'seconds':>10}{'records/s':>14}{'py heap MB':>12}{'process peak MB':>17}")
+    for name, stage in stages.items():
+        stage_rows = rows.get(name, len(df))
+        rate = stage_rows / stage['seconds'] if stage['seconds'] else float('inf')
+        stage['records_per_second'] = rate
+        peak_rss = 'n/a' if stage['process_peak_rss_mb'] is None else f"{stage['process_peak_rss_mb']:.1f}"
+        print(f"{name:<14}{stage['seconds']:>10.3f}{rate:>14.0f}{stage['py_heap_peak_mb']:>12.1f}{peak_rss:>17}")
+    return stages
+
+
+# Imports the DAG file in a fresh interpreter, like the scheduler's DAG processor does. Airflow
+# is already loaded there (and itself imports requests), so only what the DAG file adds counts.
+_PARSE_SNIPPET = """
+import json, sys, time
+import airflow.operators.bash, airflow.operators.python, airflow.utils.dates
+preloaded = set(sys.modules)
+started = time.perf_counter()
+import weather_bigquery_dag
+seconds = time.perf_counter() - started
+heavy = [name for name in weather_bigquery_dag.HEAVY_MODULES if name in sys.modules and name not in preloaded]
+print(json.dumps({'seconds': seconds, 'heavy_modules': heavy}))
+"""
+
+
+def benchmark_parse(repeat: int = 5) -> dict:
+    """Time a cold import of the DAG file and fail if it pulls in heavy dependencies"""
+    dag_dir = os.path.dirname(os.path.abspath(__file__))
+    timings = []
+    heavy = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, '-c', _PARSE_SNIPPET],
+            cwd=dag_dir, check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        timings.append(result['seconds'])
+        heavy = result['heavy_modules']
+
+    print(f"DAG parse: min {min(timings) * 1000:.1f} ms, "
+          f"median {sorted(timings)[len(timings) // 2] * 1000:.1f} ms over {repeat} runs")
+    if heavy:
+        raise AssertionError(f"Parsing the DAG imported heavy modules: {heavy}")
+    print("No heavy modules imported at parse time")
+    return {'timings': timings, 'heavy_modules': heavy}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    transform_parser = subparsers.add_parser('transform', help='legacy vs typed transform_data')
+    transform_parser.add_argument('--rows', type=int, default=1_000_000)
+
+    pipeline_parser = subparsers.add_parser('pipeline', help='end-to-end run against local stubs')
+    pipeline_parser.add_argument('--cities', type=int, default=50)
+    pipeline_parser.add_argument('--days-back', type=int, default=7)
+    pipeline_parser.add_argument('--concurrency', type=int, default=4)
+    pipeline_parser.add_argument('--batch-size', type=int, default=50)
+    pipeline_parser.add_argument('--latency', type=float, default=0.05, help='stub server delay per request')
+    pipeline_parser.add_argument('--load-format', choices=['parquet', 'csv'], default='parquet')
+
+    parse_parser = subparsers.add_parser('parse', help='DAG file import time and heavy-module check')
+    parse_parser.add_argument('--repeat', type=int, default=5)
+
+    args = parser.parse_args()
+    if args.command == 'transform':
+        benchmark_transform(args.rows)
+    elif args.command == 'pipeline':
+        benchmark_pipeline(args.cities, args.days_back, args.concurrency, args.batch_size,
+                           args.latency, args.load_format)
+    elif args.command == 'parse':
+        benchmark_parse(args.repeat)
@@ -1,18 +1,52 @@
+from __future__ import annotations  # Keep pandas/bigquery type hints from importing at parse time
+
 from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
 from airflow import DAG
 from airflow.operators.python import PythonOperator
 from airflow.operators.bash import BashOperator
 from airflow.utils.dates import days_ago
-import requests
-import pandas as pd
+import importlib
 import time
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union, Callable, Optional
 import json
-from google.cloud import bigquery
-from google.oauth2 import service_account
 import os
 import io
+import threading
+import hashlib
+import tempfile
+import functools
+import socket
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+
+class _LazyModule:
+    """Module proxy that imports the real module on first attribute access
+
+    The scheduler re-parses this file constantly, so heavy dependencies are only
+    loaded once a task actually uses them.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr: str):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+pd = _LazyModule('pandas')
+np = _LazyModule('numpy')
+requests = _LazyModule('requests')
+bigquery = _LazyModule('google.cloud.bigquery')
+service_account = _LazyModule('google.oauth2.service_account')
+
+# Modules that must not be imported while Airflow parses the DAG
+HEAVY_MODULES = ['pandas', 'numpy', 'requests', 'pyarrow', 'google.cloud.bigquery', 'google.oauth2']
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -23,82 +57,792 @@ CONFIG = {
     'project_id': 'uk-cities-weather',
     'credentials_path': '/opt/airflow/config/uk-cities-weather-9372a013498e.json',  # Path inside container
     'table_id': 'uk-cities-weather.weather_dataset.hourly_weather',
-    'location': 'EU'
+    'location': 'EU',
+    'max_concurrency': 4,  # Parallel city requests; 1 keeps the sequential path
+    'requests_per_second': 1.0,  # Token-bucket rate limit for Open-Meteo
+    'burst': 1,
+    'max_retries': 5,  # Retries on 429/5xx with exponential backoff
+    'backoff_factor': 1.0,
+    'request_timeout': (5, 30),  # (connect, read) seconds
+    'batch_size': 50,  # Cities per multi-location Open-Meteo request
+    'incremental': False,  # Only load observed hours after each city's last loaded timestamp
+    'watermark_backend': 'file',  # 'file' or 'variable' (Airflow Variable)
+    'watermark_path': '/opt/airflow/data/weather_watermarks.json',
+    'watermark_variable': 'weather_watermarks',
+    'use_cache': False,  # Reuse raw API responses on retries and backfills
+    'cache_dir': '/opt/airflow/data/weather_cache',
+    'cache_ttl_seconds': 6 * 3600,
+    'cache_max_bytes': 500 * 1024 * 1024,
+    'columnar': True,  # Extract {column: [values]} instead of one dict per hour
+    'load_format': 'parquet',  # 'parquet' (needs pyarrow) or 'csv'
+    'spool_max_bytes': 64 * 1024 * 1024,  # Parquet payloads larger than this spill to a temp file
+    'load_chunk_rows': 500000,  # Split loads into chunks of at most this many rows (None = single job)
+    'load_chunk_bytes': 256 * 1024 * 1024,  # ...and at most roughly this many in-memory bytes
+    'load_checkpoint_dir': '/opt/airflow/data/load_checkpoints',
+    'xcom_mode': 'records',  # 'records' (JSON in XCom) or 'artifact' (Parquet file + checksum in XCom)
+    'artifact_dir': '/opt/airflow/data/artifacts',  # Must be on a volume shared by all workers
+    'artifact_retention_days': 3,
+    'typed_transform': True,  # float64/NaN, nullable Int8 and categorical city instead of object columns
+    'write_mode': 'append',  # 'append' or 'merge' (upsert on city + timestamp via a staging table)
+    'metrics_callback': None,  # Callable receiving each task's metrics summary
+    'metrics_textfile_dir': None,  # Directory for Prometheus node_exporter textfile metrics
+    'statsd_host': None,  # StatsD host for per-stage metrics (UDP)
+    'statsd_port': 8125,
+    'shard_count': 1,  # >1 maps extract/transform over city shards in parallel and fans in to one load
 }
 
+CITIES = {
+    'London': {'lat': 51.5074, 'lon': -0.1278},
+    'Manchester': {'lat': 53.4808, 'lon': -2.2426},
+    'Liverpool': {'lat': 53.4084, 'lon': -2.9916},
+    'Edinburgh': {'lat': 55.9533, 'lon': -3.1883}
+}
+
+# Open-Meteo hourly variable -> output column
+HOURLY_FIELDS = {
+    'temperature_2m': 'temperature_celsius',
+    'relative_humidity_2m': 'humidity_percent',
+    'precipitation': 'precipitation_mm',
+    'wind_speed_10m': 'wind_speed_kmh',
+    'wind_direction_10m': 'wind_direction_degrees',
+    'pressure_msl': 'pressure_hpa',
+}
+RAW_COLUMNS = ['city', 'timestamp'] + list(HOURLY_FIELDS.values()) + ['extracted_at']
+API_TIMEZONE = 'Europe/London'  # Open-Meteo returns local wall-clock timestamps in this zone
+
+# Data quality rules; override with CONFIG['quality_rules']. 'error' fails the task, 'warning' only logs.
+DEFAULT_QUALITY_RULES = {
+    'required_columns': ['city', 'timestamp', 'temperature_celsius'],
+    'null_ratio': {
+        'temperature_celsius': {'max': 0.5, 'severity': 'error'},
+        'humidity_percent': {'max': 0.5, 'severity': 'warning'},
+        'pressure_hpa': {'max': 0.5, 'severity': 'warning'},
+    },
+    'range': {
+        'temperature_celsius': {'min': -40, 'max': 45, 'severity': 'warning'},
+        'humidity_percent': {'min': 0, 'max': 100, 'severity': 'error'},
+        'precipitation_mm': {'min': 0, 'max': 200, 'severity': 'warning'},
+        'wind_speed_kmh': {'min': 0, 'max': 300, 'severity': 'warning'},
+        'wind_direction_degrees': {'min': 0, 'max': 360, 'severity': 'error'},
+        'pressure_hpa': {'min': 870, 'max': 1090, 'severity': 'warning'},
+    },
+    'duplicates': {'keys': ['city', 'timestamp'], 'max': 0, 'severity': 'warning'},
+    'rows_per_city': {'min': 1, 'severity': 'error'},
+    'freshness': {'column': 'timestamp', 'max_age_hours': 48, 'severity': 'warning'},
+}
+
+
+class TokenBucket:
+    """Thread-safe token bucket used to rate limit API requests"""
+
+    def __init__(self, rate: float, capacity: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available, then consume it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class WatermarkStore:
+    """Per-city high-watermark (last loaded timestamp) persisted in a JSON file or Airflow Variable"""
+
+    def __init__(self, backend: str = 'file', path: str = None, variable_key: str = None):
+        if backend not in ('file', 'variable'):
+            raise ValueError(f"Unknown watermark backend: {backend}")
+        self.backend = backend
+        self.path = path
+        self.variable_key = variable_key
+
+    def load(self) -> Dict[str, str]:
+        """Return {city: 'YYYY-MM-DDTHH:MM'} for every city with a stored watermark"""
+        if self.backend == 'variable':
+            from airflow.models import Variable
+            return Variable.get(self.variable_key, default_var={}, deserialize_json=True) or {}
+
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        with open(self.path) as f:
+            return json.load(f)
+
+    def save(self, watermarks: Dict[str, str]) -> None:
+        """Persist watermarks, replacing the previous state"""
+        if self.backend == 'variable':
+            from airflow.models import Variable
+            Variable.set(self.variable_key, watermarks, serialize_json=True)
+            return
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Write to a temp file first so a crash never leaves a half-written state file
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(watermarks, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+class ResponseCache:
+    """Content-addressed on-disk cache for raw API responses with TTL and size-based eviction"""
+
+    def __init__(self, cache_dir: str, ttl_seconds: float, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(url: str, params: Dict) -> str:
+        """Hash the request URL and parameters into a stable cache key"""
+        payload = json.dumps({'url': url, 'params': params}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Any:
+        """Return the cached response body, or None if missing or expired"""
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                os.remove(path)
+                return None
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key: str, data: Any) -> None:
+        """Store a response body and evict old entries if the cache is over budget"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self) -> None:
+        """Drop expired entries, then the oldest ones until the cache fits in max_bytes"""
+        with self._lock:
+            now = time.time()
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                if not entry.name.endswith('.json'):
+                    continue
+                stat = entry.stat()
+                if now - stat.st_mtime > self.ttl_seconds:
+                    os.remove(entry.path)
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                os.remove(path)
+                total -= size
+
+
+class ArtifactStore:
+    """Parquet files on a shared path used to hand DataFrames between tasks"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    @staticmethod
+    def checksum(path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def write(self, df: pd.DataFrame, run_id: str, name: str) -> Dict[str, Any]:
+        """Write a DataFrame and return the small reference to push through XCom"""
+        safe_run_id = ''.join(c if c.isalnum() or c in '-_.' else '_' for c in run_id)
+        run_dir = os.path.join(self.root, safe_run_id)
+        os.makedirs(run_dir, exist_ok=True)
+
+        path = os.path.join(run_dir, f"{name}.parquet")
+        tmp_path = f"{path}.tmp"
+        df.to_parquet(tmp_path, index=False, compression='snappy')
+        os.replace(tmp_path, path)
+
+        return {'artifact_path': path, 'checksum': self.checksum(path), 'rows': len(df)}
+
+    def read(self, ref: Dict[str, Any]) -> pd.DataFrame:
+        """Read an artifact back, verifying it has not changed since it was written"""
+        path = ref['artifact_path']
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Artifact not found: {path}")
+        if self.checksum(path) != ref['checksum']:
+            raise ValueError(f"Checksum mismatch for artifact: {path}")
+        return pd.read_parquet(path)
+
+    def purge(self, max_age_days: float) -> None:
+        """Remove run directories older than max_age_days"""
+        if not os.path.isdir(self.root):
+            return
+        cutoff = time.time() - max_age_days * 86400
+        for entry in os.scandir(self.root):
+            if entry.is_dir() and entry.stat().st_mtime < cutoff:
+                for artifact in os.scandir(entry.path):
+                    os.remove(artifact.path)
+                os.rmdir(entry.path)
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far, in MB"""
+    try:
+        import resource
+    except ImportError:  # Not available on Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak / (1024 * 1024) if os.uname().sysname == 'Darwin' else peak / 1024
+
+
+class PipelineMetrics:
+    """Per-stage wall time, rows and bytes for one pipeline instance, plus process peak RSS
+
+    Stages: extract (API calls), process (response parsing), transform,
+    serialise (XCom artifacts and load payload rendering) and load. Stages may nest,
+    e.g. load includes the serialise time of its payloads. process_peak_rss_mb is the process's
+    lifetime high-water mark when the stage last ended, so it carries over earlier peaks; it
+    shows how large a worker grew, not how much one stage used.
+    """
+
+    def __init__(self, callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 textfile_dir: str = None, statsd_host: str = None, statsd_port: int = 8125,
+                 prefix: str = 'weather_pipeline'):
+        self.callback = callback
+        self.textfile_dir = textfile_dir
+        self.statsd_host = statsd_host
+        self.statsd_port = statsd_port
+        self.prefix = prefix
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float = 0.0, rows: int = 0, nbytes: int = 0,
+               calls: int = 1) -> None:
+        """Accumulate measurements for a stage; safe to call from worker threads"""
+        peak_rss = _peak_rss_mb()
+        with self._lock:
+            stage = self.stages.setdefault(
+                name, {'seconds': 0.0, 'rows': 0, 'bytes': 0, 'calls': 0, 'process_peak_rss_mb': None}
+            )
+            stage['seconds'] += seconds
+            stage['rows'] += rows
+            stage['bytes'] += nbytes
+            stage['calls'] += calls
+            if peak_rss is not None:
+                stage['process_peak_rss_mb'] = max(stage['process_peak_rss_mb'] or 0.0, peak_rss)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a block; set 'rows' / 'bytes' on the yielded dict to record volumes"""
+        counters = {'rows': 0, 'bytes': 0}
+        started = time.perf_counter()
+        try:
+            yield counters
+        finally:
+            self.record(name, time.perf_counter() - started, counters['rows'], counters['bytes'])
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: dict(stage) for name, stage in self.stages.items()}
+
+    def emit(self, labels: Dict[str, str] = None) -> Dict[str, Any]:
+        """Log the summary and send it to the configured exporters"""
+        labels = labels or {}
+        summary = self.summary()
+        for name, stage in summary.items():
+            rate = stage['rows'] / stage['seconds'] if stage['seconds'] else 0.0
+            logger.info(
+                f"[metrics] {name}: {stage['seconds']:.3f}s, {stage['rows']} rows ({rate:.0f}/s), "
+                f"{stage['bytes']} bytes, process peak RSS {stage['process_peak_rss_mb'] or 0:.1f} MB"
+            )
+
+        report = {'labels': labels, 'stages': summary}
+        for exporter in (self._export_callback, self._export_textfile, self._export_statsd):
+            try:
+                exporter(report)
+            except Exception as e:
+                # Metrics must never fail the pipeline
+                logger.warning(f"Metrics export failed in {exporter.__name__}: {str(e)}")
+        return report
+
+    def _export_callback(self, report: Dict[str, Any]) -> None:
+        if self.callback:
+            self.callback(report)
+
+    def _export_textfile(self, report: Dict[str, Any]) -> None:
+        if not self.textfile_dir:
+            return
+        labels = report['labels']
+        lines = []
+        for metric, key in (('seconds', 'seconds'), ('rows', 'rows'), ('bytes', 'bytes'),
+                            ('process_peak_rss_megabytes', 'process_peak_rss_mb')):
+            lines.append(f"# TYPE {self.prefix}_stage_{metric} gauge")
+            for name, stage in report['stages'].items():
+                label_text = ','.join(
+                    [f'stage="{name}"'] + [f'{k}="{v}"' for k, v in sorted(labels.items())]
+                )
+                lines.append(f"{self.prefix}_stage_{metric}{{{label_text}}} {stage[key] or 0}")
+
+        # node_exporter reads *.prom files, so write one file per task and swap it in atomically
+        os.makedirs(self.textfile_dir, exist_ok=True)
+        path = os.path.join(self.textfile_dir, f"{self.prefix}_{labels.get('task', 'pipeline')}.prom")
+        with open(f"{path}.tmp", 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(f"{path}.tmp", path)
+
+    def _export_statsd(self, report: Dict[str, Any]) -> None:
+        if not self.statsd_host:
+            return
+        task = report['labels'].get('task', 'pipeline')
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            for name, stage in report['stages'].items():
+                key = f"{self.prefix}.{task}.{name}"
+                for line in (f"{key}.duration:{stage['seconds'] * 1000:.0f}|ms",
+                             f"{key}.rows:{stage['rows']}|g",
+                             f"{key}.bytes:{stage['bytes']}|g",
+                             f"{key}.process_peak_rss_mb:{stage['process_peak_rss_mb'] or 0:.1f}|g"):
+                    sock.sendto(line.encode('utf-8'), (self.statsd_host, self.statsd_port))
+
+
+def instrumented(stage_name: str):
+    """Record a WeatherDataPipeline method as a metrics stage
+
+    Rows are taken from the returned data, or from a DataFrame argument for methods
+    that return nothing (e.g. load_to_bigquery).
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.stage(stage_name) as counters:
+                result = method(self, *args, **kwargs)
+                source = result if result is not None else next(iter(args), None)
+                if isinstance(source, (list, dict, pd.DataFrame)):
+                    counters['rows'] = WeatherDataPipeline.count_records(source)
+            return result
+        return wrapper
+    return decorator
+
+
+# Process-level caches so every task in a worker reuses one schema, credential and client
+_CACHE_LOCK = threading.Lock()
+_BIGQUERY_CLIENTS = {}
+_PIPELINES = {}
+
+
+@functools.lru_cache(maxsize=None)
+def bigquery_schema() -> List[bigquery.SchemaField]:
+    """Define BigQuery schema to avoid autodetect issues"""
+    return [
+        bigquery.SchemaField("city", "STRING", mode="REQUIRED"),
+        bigquery.SchemaField("timestamp", "TIMESTAMP", mode="REQUIRED"),
+        bigquery.SchemaField("temperature_celsius", "FLOAT64", mode="NULLABLE"),
+        bigquery.SchemaField("humidity_percent", "FLOAT64", mode="NULLABLE"),
+        bigquery.SchemaField("precipitation_mm", "FLOAT64", mode="NULLABLE"),
+        bigquery.SchemaField("wind_speed_kmh", "FLOAT64", mode="NULLABLE"),
+        bigquery.SchemaField("wind_direction_degrees", "FLOAT64", mode="NULLABLE"),
+        bigquery.SchemaField("pressure_hpa", "FLOAT64", mode="NULLABLE"),
+        bigquery.SchemaField("extracted_at", "TIMESTAMP", mode="REQUIRED"),
+        bigquery.SchemaField("date", "DATE", mode="REQUIRED"),
+        bigquery.SchemaField("hour", "INTEGER", mode="REQUIRED"),
+        bigquery.SchemaField("day_of_week", "INTEGER", mode="REQUIRED"),
+        bigquery.SchemaField("month", "INTEGER", mode="REQUIRED"),
+    ]
+
+
+@functools.lru_cache(maxsize=None)
+def load_credentials(credentials_path: str):
+    """Read a service-account key file once per process"""
+    logger.info(f"Using credentials from: {credentials_path}")
+    
+    if not os.path.exists(credentials_path):
+        raise FileNotFoundError(f"Credentials file not found: {credentials_path}")
+        
+    return service_account.Credentials.from_service_account_file(credentials_path)
+
+
+def get_bigquery_client(config: Dict[str, Any]) -> bigquery.Client:
+    """Return the process-wide BigQuery client for a project and credential, creating it on first use"""
+    key = (config['project_id'], config.get('credentials_path'))
+    with _CACHE_LOCK:
+        client = _BIGQUERY_CLIENTS.get(key)
+        if client is None:
+            if 'credentials_path' in config:
+                client = bigquery.Client(
+                    credentials=load_credentials(config['credentials_path']), 
+                    project=config['project_id']
+                )
+            else:
+                logger.info("Using default credentials")
+                client = bigquery.Client(project=config['project_id'])
+            _BIGQUERY_CLIENTS[key] = client
+    return client
+
+
+def get_pipeline(config: Dict[str, Any] = None) -> 'WeatherDataPipeline':
+    """Return this process's pipeline for config, reset for a new task
+
+    The pipeline keeps its HTTP session, stores and BigQuery client between tasks;
+    per-task state (cities, metrics) is reset on every call.
+    """
+    config = CONFIG if config is None else config
+    with _CACHE_LOCK:
+        pipeline = _PIPELINES.get(id(config))
+        if pipeline is None or pipeline.config is not config:
+            pipeline = WeatherDataPipeline(config)
+            _PIPELINES[id(config)] = pipeline
+            return pipeline
+    pipeline.reset()
+    return pipeline
+
+
 class WeatherDataPipeline:
     """Weather data pipeline adapted for Airflow"""
     
     def __init__(self, config: Dict[str, Any]):
         self.config = config
-        self.cities = {
-            'London': {'lat': 51.5074, 'lon': -0.1278},
-            'Manchester': {'lat': 53.4808, 'lon': -2.2426},
-            'Liverpool': {'lat': 53.4084, 'lon': -2.9916},
-            'Edinburgh': {'lat': 55.9533, 'lon': -3.1883}
-        }
         self.base_url = "https://api.open-meteo.com/v1/forecast"
+        self._session = None
+        self.watermark_store = WatermarkStore(
+            backend=config.get('watermark_backend', 'file'),
+            path=config.get('watermark_path'),
+            variable_key=config.get('watermark_variable', 'weather_watermarks')
+        )
+        self.artifact_store = ArtifactStore(config.get('artifact_dir', 'artifacts'))
+        self.reset()
+        self.response_cache = ResponseCache(
+            cache_dir=config.get('cache_dir', 'weather_cache'),
+            ttl_seconds=config.get('cache_ttl_seconds', 6 * 3600),
+            max_bytes=config.get('cache_max_bytes', 500 * 1024 * 1024)
+        )
 
-        # Define BigQuery schema to avoid autodetect issues
-        self.bq_schema = [
-            bigquery.SchemaField("city", "STRING", mode="REQUIRED"),
-            bigquery.SchemaField("timestamp", "TIMESTAMP", mode="REQUIRED"),
-            bigquery.SchemaField("temperature_celsius", "FLOAT64", mode="NULLABLE"),
-            bigquery.SchemaField("humidity_percent", "FLOAT64", mode="NULLABLE"),
-            bigquery.SchemaField("precipitation_mm", "FLOAT64", mode="NULLABLE"),
-            bigquery.SchemaField("wind_speed_kmh", "FLOAT64", mode="NULLABLE"),
-            bigquery.SchemaField("wind_direction_degrees", "FLOAT64", mode="NULLABLE"),
-            bigquery.SchemaField("pressure_hpa", "FLOAT64", mode="NULLABLE"),
-            bigquery.SchemaField("extracted_at", "TIMESTAMP", mode="REQUIRED"),
-            bigquery.SchemaField("date", "DATE", mode="REQUIRED"),
-            bigquery.SchemaField("hour", "INTEGER", mode="REQUIRED"),
-            bigquery.SchemaField("day_of_week", "INTEGER", mode="REQUIRED"),
-            bigquery.SchemaField("month", "INTEGER", mode="REQUIRED"),
-        ]
+    @property
+    def bq_schema(self) -> List[bigquery.SchemaField]:
+        """BigQuery schema shared by every pipeline in the process"""
+        return bigquery_schema()
 
-    def extract_weather_data(self, days_back: int = 7) -> List[Dict]:
-        """Extract weather data from Open-Meteo API"""
-        all_weather_data = []
+    def reset(self) -> None:
+        """Clear per-task state so a cached pipeline can serve the next task"""
+        self.cities = dict(CITIES)
+        self.metrics = PipelineMetrics(
+            callback=self.config.get('metrics_callback'),
+            textfile_dir=self.config.get('metrics_textfile_dir'),
+            statsd_host=self.config.get('statsd_host'),
+            statsd_port=self.config.get('statsd_port', 8125)
+        )
+
+    @instrumented('extract')
+    def extract_weather_data(self, days_back: int = 7, concurrency: int = None,
+                             batch_size: int = None, incremental: bool = None,
+                             use_cache: bool = None,
+                             columnar: bool = None) -> Union[List[Dict], Dict[str, List]]:
+        """Extract weather data from Open-Meteo API
+
+        Returns a list of per-hour records, or {column: [values]} when columnar is set.
+        """
         end_date = datetime.now().date()
         start_date = end_date - timedelta(days=days_back)
 
+        if batch_size is None:
+            batch_size = self.config.get('batch_size', 1)
+        if incremental is None:
+            incremental = self.config.get('incremental', False)
+        if use_cache is None:
+            use_cache = self.config.get('use_cache', False)
+        if columnar is None:
+            columnar = self.config.get('columnar', False)
+
+        watermarks = self.get_watermarks() if incremental else {}
+        # Incremental runs keep only observed hours: forecast hours would be loaded again by the
+        # next run, since the watermark never moves past the last observed hour
+        observed_until = self.last_observed_hour() if incremental else None
+
+        # Cities in one request must share a date range, so batch within each range
+        ranges = {}
         for city_name, coordinates in self.cities.items():
+            city_start = start_date
+            if city_name in watermarks:
+                # Watermarks never pass the last observed hour, so this is at most today
+                city_start = datetime.strptime(watermarks[city_name][:10], '%Y-%m-%d').date()
+            ranges.setdefault(city_start, []).append((city_name, coordinates))
+
+        batches = []
+        for range_start, locations in ranges.items():
+            for batch in self._make_batches(locations, batch_size):
+                batches.append((batch, range_start))
+
+        if concurrency is None:
+            concurrency = self.config.get('max_concurrency', 1)
+        concurrency = max(1, min(concurrency, len(batches) or 1))
+
+        rate_limiter = TokenBucket(
+            self.config.get('requests_per_second', 1.0),
+            self.config.get('burst', 1)
+        )
+
+        def fetch(item):
+            batch, range_start = item
+            return self._extract_batch(batch, range_start, end_date, rate_limiter,
+                                       use_cache, columnar)
+
+        if concurrency == 1:
+            results = [fetch(batch) for batch in batches]
+        else:
+            logger.info(f"Extracting {len(batches)} batches with concurrency {concurrency}")
+            # map() keeps results in batch order, so output matches the sequential path
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                results = list(executor.map(fetch, batches))
+
+        if columnar:
+            columns = self._concat_columns(results)
+            if incremental:
+                keep = [
+                    watermarks.get(city, '') < timestamp <= observed_until
+                    for city, timestamp in zip(columns['city'], columns['timestamp'])
+                ]
+                if not all(keep):
+                    columns = {
+                        name: [value for value, kept in zip(values, keep) if kept]
+                        for name, values in columns.items()
+                    }
+            logger.info(f"Successfully extracted {len(columns['city'])} weather records")
+            return columns
+
+        all_weather_data = []
+        for hourly_data in results:
+            all_weather_data.extend(hourly_data)
+
+        if incremental:
+            # The API works in whole days, so drop hours at or before each city's watermark
+            all_weather_data = [
+                record for record in all_weather_data
+                if watermarks.get(record['city'], '') < record['timestamp'] <= observed_until
+            ]
+
+        logger.info(f"Successfully extracted {len(all_weather_data)} weather records")
+        return all_weather_data
+
+    @staticmethod
+    def _concat_columns(parts: List[Dict[str, List]]) -> Dict[str, List]:
+        """Concatenate per-batch column dicts into one"""
+        columns = {name: [] for name in RAW_COLUMNS}
+        for part in parts:
+            for name in RAW_COLUMNS:
+                columns[name].extend(part.get(name, []))
+        return columns
+
+    @staticmethod
+    def count_records(data: Union[List[Dict], Dict[str, List], pd.DataFrame]) -> int:
+        """Number of rows in row- or column-oriented extract output"""
+        if isinstance(data, dict):
+            return len(data.get('city', []))
+        return len(data)
+
+    @staticmethod
+    def _make_batches(locations: List, batch_size: int) -> List[List]:
+        """Group (city_name, coordinates) pairs into multi-location requests"""
+        batch_size = max(1, batch_size)
+        return [locations[i:i + batch_size] for i in range(0, len(locations), batch_size)]
+
+    def get_watermarks(self) -> Dict[str, str]:
+        """Load per-city watermarks, falling back to MAX(timestamp) in BigQuery for missing cities"""
+        try:
+            watermarks = self.watermark_store.load()
+        except Exception as e:
+            logger.warning(f"Could not read watermark state: {str(e)}")
+            watermarks = {}
+
+        missing = [city for city in self.cities if city not in watermarks]
+        if missing:
             try:
-                logger.info(f"Extracting weather data for {city_name}")
-                
-                params = {
-                    'latitude': coordinates['lat'],
-                    'longitude': coordinates['lon'],
-                    'start_date': start_date.isoformat(),
-                    'end_date': end_date.isoformat(),
-                    'hourly': [
-                        'temperature_2m',
-                        'relative_humidity_2m',
-                        'precipitation',
-                        'wind_speed_10m',
-                        'wind_direction_10m',
-                        'pressure_msl'
-                    ],
-                    'timezone': 'Europe/London'
-                }
-
-                response = requests.get(self.base_url, params=params)
+                watermarks.update(self._query_bigquery_watermarks(missing))
+            except Exception as e:
+                logger.warning(f"BigQuery watermark fallback failed: {str(e)}")
+
+        # The table (and older state) can hold forecast hours; never skip past what has been observed
+        last_observed = self.last_observed_hour()
+        return {city: min(value, last_observed) for city, value in watermarks.items()}
+
+    @staticmethod
+    def last_observed_hour() -> str:
+        """Start of the last complete hour in API_TIMEZONE, in the API's timestamp format
+
+        Later hours in a forecast response are predictions. Incremental extracts stop at this hour
+        and watermarks never pass it, so forecast hours are neither loaded nor skipped.
+        """
+        now = datetime.now(ZoneInfo(API_TIMEZONE)).replace(minute=0, second=0, microsecond=0)
+        return (now - timedelta(hours=1)).strftime('%Y-%m-%dT%H:%M')
+
+    def _query_bigquery_watermarks(self, cities: List[str]) -> Dict[str, str]:
+        """Read the latest loaded timestamp per city from the target table"""
+        client = self._get_bigquery_client()
+        query = f"""
+            SELECT city, MAX(timestamp) AS last_timestamp
+            FROM `{self.config['table_id']}`
+            WHERE city IN UNNEST(@cities)
+            GROUP BY city
+        """
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[bigquery.ArrayQueryParameter('cities', 'STRING', cities)]
+        )
+        rows = client.query(query, job_config=job_config).result()
+        return {
+            row['city']: row['last_timestamp'].strftime('%Y-%m-%dT%H:%M')
+            for row in rows if row['last_timestamp'] is not None
+        }
+
+    def update_watermarks(self, df: pd.DataFrame) -> None:
+        """Advance watermarks to the latest observed timestamp per city in a successfully loaded frame
+
+        Capped at last_observed_hour() like get_watermarks, so forecast hours never move it.
+        """
+        if df.empty:
+            return
+
+        watermarks = self.watermark_store.load()
+        last_observed = self.last_observed_hour()
+        latest = df.groupby('city', observed=True)['timestamp'].max()
+        for city, timestamp in latest.items():
+            value = min(timestamp.strftime('%Y-%m-%dT%H:%M'), last_observed)
+            if value > watermarks.get(city, ''):
+                watermarks[city] = value
+
+        self.watermark_store.save(watermarks)
+        logger.info(f"Updated watermarks for {len(latest)} cities")
+
+    @property
+    def session(self) -> requests.Session:
+        """Pooled HTTP session with retry/backoff, created on first use"""
+        if self._session is None:
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            retry = Retry(
+                total=self.config.get('max_retries', 5),
+                backoff_factor=self.config.get('backoff_factor', 1.0),
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset(['GET']),
+                respect_retry_after_header=True,
+                raise_on_status=False  # Let raise_for_status report the final response
+            )
+            pool_size = max(1, self.config.get('max_concurrency', 1))
+            adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            self._session = session
+        return self._session
+
+    def close(self) -> None:
+        """Close the pooled HTTP session"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def _build_params(self, locations: List, start_date, end_date) -> Dict:
+        """Build Open-Meteo request parameters for one or more locations"""
+        return {
+            'latitude': ','.join(str(coordinates['lat']) for _, coordinates in locations),
+            'longitude': ','.join(str(coordinates['lon']) for _, coordinates in locations),
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'hourly': [
+                'temperature_2m',
+                'relative_humidity_2m',
+                'precipitation',
+                'wind_speed_10m',
+                'wind_direction_10m',
+                'pressure_msl'
+            ],
+            'timezone': API_TIMEZONE
+        }
+
+    def _extract_batch(self, locations: List, start_date, end_date,
+                       rate_limiter: TokenBucket, use_cache: bool = False,
+                       columnar: bool = False) -> Union[List[Dict], Dict[str, List]]:
+        """Extract hourly records for a batch of cities in one request
+
+        Errors are raised once the session's retry policy has given up, so the task fails
+        and Airflow retries it instead of carrying on without these cities.
+        """
+        city_names = [city_name for city_name, _ in locations]
+        try:
+            logger.info(f"Extracting weather data for {', '.join(city_names)}")
+            params = self._build_params(locations, start_date, end_date)
+
+            data = None
+            if use_cache:
+                cache_key = ResponseCache.make_key(self.base_url, params)
+                data = self.response_cache.get(cache_key)
+                if data is not None:
+                    logger.info(f"Using cached response for {', '.join(city_names)}")
+
+            if data is None:
+                rate_limiter.acquire()  # Be respectful to API
+                response = self.session.get(
+                    self.base_url,
+                    params=params,
+                    timeout=self.config.get('request_timeout', (5, 30))
+                )
                 response.raise_for_status()
                 data = response.json()
-                
-                hourly_data = self._process_hourly_data(data, city_name)
-                all_weather_data.extend(hourly_data)
-                time.sleep(1)  # Be respectful to API
+                self.metrics.record('extract', nbytes=len(response.content), calls=0)
 
-            except Exception as e:
-                logger.error(f"Error extracting data for {city_name}: {str(e)}")
-                continue
+                if use_cache:
+                    try:
+                        self.response_cache.set(cache_key, data)
+                    except OSError as e:
+                        logger.warning(f"Could not write response cache: {str(e)}")
 
-        logger.info(f"Successfully extracted {len(all_weather_data)} weather records")
-        return all_weather_data
+            city_arg = city_names[0] if len(city_names) == 1 else city_names
+            with self.metrics.stage('process') as counters:
+                if columnar:
+                    processed = self._process_hourly_columns(data, city_arg, datetime.now().isoformat())
+                else:
+                    processed = self._process_hourly_data(data, city_arg)
+                counters['rows'] = self.count_records(processed)
+            return processed
 
-    def _process_hourly_data(self, api_data: Dict, city_name: str) -> List[Dict]:
+        except Exception as e:
+            logger.error(f"Error extracting data for {', '.join(city_names)}: {str(e)}")
+            raise
+
+    def _process_hourly_data(self, api_data: Union[Dict, List[Dict]],
+                             city_name: Union[str, List[str]]) -> List[Dict]:
         """Process hourly weather data from API response"""
+        # Multi-location requests return one response object per location, in request order
+        if isinstance(api_data, list):
+            city_names = [city_name] if isinstance(city_name, str) else city_name
+            if len(api_data) != len(city_names):
+                raise ValueError(
+                    f"Expected {len(city_names)} locations in response, got {len(api_data)}"
+                )
+            hourly_data = []
+            for location_data, name in zip(api_data, city_names):
+                hourly_data.extend(self._process_hourly_data(location_data, name))
+            return hourly_data
+
         hourly_data = []
         hourly = api_data.get('hourly', {})
         
@@ -123,8 +867,38 @@ class WeatherDataPipeline:
         
         return hourly_data
 
-    def transform_data(self, raw_data: List[Dict]) -> pd.DataFrame:
+    def _process_hourly_columns(self, api_data: Union[Dict, List[Dict]],
+                                city_name: Union[str, List[str]],
+                                extracted_at: str) -> Dict[str, List]:
+        """Build column arrays straight from the API's hourly arrays"""
+        if isinstance(api_data, list):
+            city_names = [city_name] if isinstance(city_name, str) else city_name
+            if len(api_data) != len(city_names):
+                raise ValueError(
+                    f"Expected {len(city_names)} locations in response, got {len(api_data)}"
+                )
+            return self._concat_columns([
+                self._process_hourly_columns(location_data, name, extracted_at)
+                for location_data, name in zip(api_data, city_names)
+            ])
+
+        hourly = api_data.get('hourly', {})
+        times = hourly.get('time', []) if hourly else []
+        n = len(times)
+
+        columns = {'city': [city_name] * n, 'timestamp': list(times)}
+        for field, column in HOURLY_FIELDS.items():
+            values = hourly.get(field) if hourly else None
+            columns[column] = list(values) if values is not None else [None] * n
+        columns['extracted_at'] = [extracted_at] * n
+        return columns
+
+    @instrumented('transform')
+    def transform_data(self, raw_data: Union[List[Dict], Dict[str, List], pd.DataFrame]) -> pd.DataFrame:
         """Transform raw weather data with proper data type handling"""
+        if self.config.get('typed_transform', False):
+            return self.transform_data_typed(raw_data)
+
         logger.info("Starting data transformation")
     
         df = pd.DataFrame(raw_data)
@@ -164,11 +938,72 @@ class WeatherDataPipeline:
         df = df.replace([float('inf'), -float('inf'), float('nan')], None)
     
         logger.info(f"Transformation complete. Dataset shape: {df.shape}")
-        logger.info(f"Data types: {df.dtypes}")
+        logger.debug(f"Data types: {df.dtypes}")
+        return df
+
+    def transform_data_typed(self, raw_data: Union[List[Dict], Dict[str, List], pd.DataFrame]) -> pd.DataFrame:
+        """Transform raw weather data into compact native dtypes without object columns
+
+        Numeric columns stay float64 with NaN for missing values, hour/day_of_week/month
+        are nullable Int8, city is categorical and date is a datetime64 at midnight.
+        """
+        logger.info("Starting typed data transformation")
+
+        # Column dicts from the columnar extract are used as-is; only row records need a frame
+        raw = pd.DataFrame(raw_data) if isinstance(raw_data, list) else raw_data
+        if self.count_records(raw) == 0:
+            logger.warning("No data to transform")
+            return pd.DataFrame(raw)
+
+        numeric_columns = list(HOURLY_FIELDS.values())
+        numeric = {}
+        for col in numeric_columns:
+            try:
+                # None becomes NaN in a float array
+                values = np.array(raw[col], dtype='float64')
+            except (TypeError, ValueError):
+                values = pd.to_numeric(pd.Series(raw[col]), errors='coerce').to_numpy(dtype='float64', na_value=np.nan, copy=True)
+            values[np.isinf(values)] = np.nan
+            numeric[col] = values
+
+        # Drop rows without temperature before any further work is done on them
+        keep = ~np.isnan(numeric['temperature_celsius'])
+        df = pd.DataFrame({
+            'city': np.asarray(raw['city'], dtype=object)[keep],
+            'timestamp': pd.to_datetime(np.asarray(raw['timestamp'], dtype=object)[keep], utc=True),
+            **{col: numeric[col][keep] for col in numeric_columns},
+            'extracted_at': pd.to_datetime(np.asarray(raw['extracted_at'], dtype=object)[keep], utc=True),
+        })
+
+        # One hash pass over the key columns
+        df = df[~df.duplicated(subset=['city', 'timestamp'])].reset_index(drop=True)
+
+        timestamp = df['timestamp'].dt
+        df['city'] = df['city'].astype('category')
+        df['date'] = timestamp.tz_localize(None).dt.normalize()
+        df['hour'] = timestamp.hour.astype('Int8')
+        df['day_of_week'] = timestamp.dayofweek.astype('Int8')
+        df['month'] = timestamp.month.astype('Int8')
+
+        logger.info(f"Transformation complete. Dataset shape: {df.shape}")
         return df
 
-    def load_to_bigquery(self, df: pd.DataFrame) -> None:
-        """Load data to BigQuery with proper schema and data type handling"""
+    def _get_bigquery_client(self) -> bigquery.Client:
+        """BigQuery client for this pipeline's project, shared across the process"""
+        return get_bigquery_client(self.config)
+
+    @instrumented('load')
+    def load_to_bigquery(self, df: pd.DataFrame,
+                         progress_callback: Optional[Callable[[int, int, int], None]] = None) -> None:
+        """Load data to BigQuery with proper schema and data type handling
+
+        Large frames are split into chunks (see load_chunk_rows / load_chunk_bytes) that are
+        uploaded in order. Completed chunks are checkpointed, so a retried task resumes from the
+        first chunk that failed. progress_callback receives (chunk_number, total_chunks, rows_loaded).
+
+        With write_mode 'merge' the chunks go to a staging table that is then merged into the
+        target on (city, timestamp), so reloading overlapping windows never duplicates rows.
+        """
         try:
             logger.info("Loading data to BigQuery")
             logger.info(f"DataFrame shape: {df.shape}")
@@ -177,82 +1012,61 @@ class WeatherDataPipeline:
                 logger.warning("No data to load")
                 return
             
-            # Initialize BigQuery client
-            if 'credentials_path' in self.config:
-                credentials_path = self.config['credentials_path']
-                logger.info(f"Using credentials from: {credentials_path}")
-                
-                if not os.path.exists(credentials_path):
-                    raise FileNotFoundError(f"Credentials file not found: {credentials_path}")
-                    
-                credentials = service_account.Credentials.from_service_account_file(
-                    credentials_path
-                )
-                client = bigquery.Client(
-                    credentials=credentials, 
-                    project=self.config['project_id']
-                )
-            else:
-                logger.info("Using default credentials")
-                client = bigquery.Client(project=self.config['project_id'])
+            client = self._get_bigquery_client()
                 
             table_id = self.config['table_id']
             logger.info(f"Target table: {table_id}")
-            
-            # Create a copy of the dataframe for BigQuery loading
-            df_bq = df.copy()
-            
-            # Format datetime columns for BigQuery
-            df_bq['timestamp'] = df_bq['timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S UTC')
-            df_bq['extracted_at'] = df_bq['extracted_at'].dt.strftime('%Y-%m-%d %H:%M:%S UTC')
-            df_bq['date'] = df_bq['date'].astype(str)
-            
-            # Ensure all numeric columns are properly formatted
-            numeric_columns = [
-                'temperature_celsius', 'humidity_percent', 'precipitation_mm',
-                'wind_speed_kmh', 'wind_direction_degrees', 'pressure_hpa'
-            ]
-            
-            for col in numeric_columns:
-                # Convert NaN to None for BigQuery compatibility
-                df_bq[col] = df_bq[col].where(pd.notnull(df_bq[col]), None)
-            
-            # Configure load job with explicit schema
-            job_config = bigquery.LoadJobConfig(
-                schema=self.bq_schema,
-                write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
-                create_disposition=bigquery.CreateDisposition.CREATE_IF_NEEDED,
-                source_format=bigquery.SourceFormat.CSV,
-                skip_leading_rows=1,  # Skip header row
-                allow_quoted_newlines=True,
-                allow_jagged_rows=False,
-                max_bad_records=0
-            )
-            
-            # Convert DataFrame to CSV
-            logger.info("Converting DataFrame to CSV format...")
-            csv_buffer = df_bq.to_csv(index=False, na_rep='')
-            
-            # Load data using CSV method
-            logger.info("Starting BigQuery load job...")
-            job = client.load_table_from_file(
-                io.StringIO(csv_buffer), 
-                table_id, 
-                job_config=job_config
+
+            merge = self.config.get('write_mode', 'append') == 'merge'
+            if merge:
+                # MERGE needs the target to exist; append loads create it themselves
+                self.ensure_table(client, table_id)
+            chunk_rows = self._chunk_rows(df)
+            digest = self._frame_digest(df, table_id, chunk_rows)
+            destination = f"{table_id}_staging_{digest[:16]}" if merge else table_id
+            if merge:
+                logger.info(f"Staging table: {destination}")
+
+            total_chunks = -(-len(df) // chunk_rows)
+            checkpoint_path = os.path.join(
+                self.config.get('load_checkpoint_dir', 'load_checkpoints'), f"{digest}.json"
             )
-            
-            # Wait for completion and handle errors
-            job.result()
-            
-            if job.errors:
-                logger.error(f"Load job completed with errors: {job.errors}")
-                raise Exception(f"BigQuery load failed with errors: {job.errors}")
-            
-            logger.info(f"Successfully loaded {len(df)} rows to BigQuery")
-            
-            # Log job statistics
-            if job.output_rows:
-                logger.info(f"Job statistics - Output rows: {job.output_rows}")
+            completed = self._read_checkpoint(checkpoint_path) if total_chunks > 1 else set()
+            if completed:
+                logger.info(f"Resuming load: {len(completed)}/{total_chunks} chunks already loaded")
+
+            rows_loaded = 0
+            for chunk_index in range(total_chunks):
+                chunk = df.iloc[chunk_index * chunk_rows:(chunk_index + 1) * chunk_rows]
+                if chunk_index not in completed:
+                    # The first chunk resets a staging table left over from an earlier failed run
+                    if merge and chunk_index == 0:
+                        write_disposition = bigquery.WriteDisposition.WRITE_TRUNCATE
+                    else:
+                        write_disposition = bigquery.WriteDisposition.WRITE_APPEND
+
+                    if total_chunks > 1:
+                        logger.info(f"Loading chunk {chunk_index + 1}/{total_chunks} ({len(chunk)} rows)")
+                    self._run_load_job(client, chunk, destination, write_disposition)
+                    if total_chunks > 1:
+                        completed.add(chunk_index)
+                        try:
+                            self._write_checkpoint(checkpoint_path, completed)
+                        except OSError as e:
+                            # Resuming is an optimisation; without it a retry reloads every chunk
+                            logger.warning(f"Could not write load checkpoint: {str(e)}")
+
+                rows_loaded += len(chunk)
+                if progress_callback:
+                    progress_callback(chunk_index + 1, total_chunks, rows_loaded)
+
+            if merge:
+                self._merge_from_staging(client, destination, table_id, df)
+
+            # Every chunk is in BigQuery, so a fresh run of the same data must load again
+            if os.path.exists(checkpoint_path):
+                os.remove(checkpoint_path)
+            logger.info(f"Successfully loaded {len(df)} rows to BigQuery in {total_chunks} chunk(s)")
             
         except Exception as e:
             logger.error(f"Error loading to BigQuery: {str(e)}")
@@ -261,6 +1075,247 @@ class WeatherDataPipeline:
             logger.error(f"Full traceback: {traceback.format_exc()}")
             raise
 
+    def _run_load_job(self, client: bigquery.Client, df: pd.DataFrame, table_id: str,
+                      write_disposition: str = None):
+        """Submit one load job in the configured format and wait for it"""
+        write_disposition = write_disposition or bigquery.WriteDisposition.WRITE_APPEND
+        load_format = self.config.get('load_format', 'csv')
+        if load_format == 'parquet':
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                logger.warning("pyarrow is not installed, falling back to CSV load")
+                load_format = 'csv'
+
+        if load_format == 'parquet':
+            job = self._load_parquet(client, df, table_id, write_disposition)
+        else:
+            job = self._load_csv(client, df, table_id, write_disposition)
+        
+        # Wait for completion and handle errors
+        job.result()
+        
+        if job.errors:
+            logger.error(f"Load job completed with errors: {job.errors}")
+            raise Exception(f"BigQuery load failed with errors: {job.errors}")
+        
+        # Log job statistics
+        if job.output_rows:
+            logger.info(f"Job statistics - Output rows: {job.output_rows}")
+        return job
+
+    def ensure_table(self, client: bigquery.Client, table_id: str) -> None:
+        """Create the target table partitioned by date and clustered by city if it does not exist"""
+        table = bigquery.Table(table_id, schema=self.bq_schema)
+        table.time_partitioning = bigquery.TimePartitioning(
+            type_=bigquery.TimePartitioningType.DAY,
+            field='date'
+        )
+        table.clustering_fields = ['city']
+        table = client.create_table(table, exists_ok=True)
+
+        if not table.time_partitioning or table.clustering_fields != ['city']:
+            logger.warning(
+                f"{table_id} already exists without date partitioning / city clustering; "
+                "recreate it to get partition pruning on loads and queries"
+            )
+
+    def build_merge_sql(self, staging_table_id: str, table_id: str) -> str:
+        """MERGE statement that upserts staged rows into the target on (city, timestamp)"""
+        columns = [field.name for field in self.bq_schema]
+        updates = ',\n                '.join(
+            f"{col} = S.{col}" for col in columns if col not in ('city', 'timestamp')
+        )
+        insert_columns = ', '.join(columns)
+        insert_values = ', '.join(f"S.{col}" for col in columns)
+
+        # The date range filter on T lets BigQuery prune partitions outside the batch
+        return f"""
+            MERGE `{table_id}` T
+            USING (
+                SELECT * FROM `{staging_table_id}`
+                WHERE TRUE
+                QUALIFY ROW_NUMBER() OVER (PARTITION BY city, timestamp ORDER BY extracted_at DESC) = 1
+            ) S
+            ON T.city = S.city AND T.timestamp = S.timestamp
+                AND T.date BETWEEN @min_date AND @max_date
+            WHEN MATCHED THEN UPDATE SET
+                {updates}
+            WHEN NOT MATCHED THEN
+                INSERT ({insert_columns}) VALUES ({insert_values})
+        """
+
+    def _merge_from_staging(self, client: bigquery.Client, staging_table_id: str,
+                            table_id: str, df: pd.DataFrame) -> None:
+        """Merge the staging table into the target and drop it"""
+        dates = pd.to_datetime(df['date'])
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ScalarQueryParameter('min_date', 'DATE', dates.min().date()),
+                bigquery.ScalarQueryParameter('max_date', 'DATE', dates.max().date()),
+            ]
+        )
+
+        logger.info(f"Merging {staging_table_id} into {table_id}")
+        job = client.query(self.build_merge_sql(staging_table_id, table_id), job_config=job_config)
+        job.result()
+        if job.errors:
+            raise Exception(f"BigQuery merge failed with errors: {job.errors}")
+        logger.info(f"Merge complete - rows affected: {job.num_dml_affected_rows}")
+
+        client.delete_table(staging_table_id, not_found_ok=True)
+
+    def _chunk_rows(self, df: pd.DataFrame) -> int:
+        """Rows per load chunk that satisfy both the row and the byte budget"""
+        chunk_rows = self.config.get('load_chunk_rows') or len(df)
+        chunk_bytes = self.config.get('load_chunk_bytes')
+        if chunk_bytes:
+            bytes_per_row = df.memory_usage(index=False, deep=True).sum() / len(df)
+            chunk_rows = min(chunk_rows, int(chunk_bytes // max(bytes_per_row, 1)))
+        return max(1, chunk_rows)
+
+    def _frame_digest(self, df: pd.DataFrame, table_id: str, chunk_rows: int) -> str:
+        """Identify a load by the frame's content and chunking (checkpoint and staging names)"""
+        digest = hashlib.sha256()
+        digest.update(f"{table_id}:{chunk_rows}:{len(df)}".encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+        return digest.hexdigest()
+
+    @staticmethod
+    def _read_checkpoint(path: str) -> set:
+        if not os.path.exists(path):
+            return set()
+        with open(path) as f:
+            return set(json.load(f)['completed_chunks'])
+
+    @staticmethod
+    def _write_checkpoint(path: str, completed: set) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'completed_chunks': sorted(completed)}, f)
+        os.replace(tmp_path, path)
+
+    def _load_csv(self, client: bigquery.Client, df: pd.DataFrame, table_id: str,
+                  write_disposition: str = None):
+        """Submit a load job from a CSV rendering of the DataFrame"""
+        # Create a copy of the dataframe for BigQuery loading
+        df_bq = df.copy()
+        
+        # Format datetime columns for BigQuery
+        df_bq['timestamp'] = df_bq['timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S UTC')
+        df_bq['extracted_at'] = df_bq['extracted_at'].dt.strftime('%Y-%m-%d %H:%M:%S UTC')
+        if pd.api.types.is_datetime64_any_dtype(df_bq['date']):
+            df_bq['date'] = df_bq['date'].dt.strftime('%Y-%m-%d')
+        else:
+            df_bq['date'] = df_bq['date'].astype(str)
+        
+        # Ensure all numeric columns are properly formatted
+        numeric_columns = [
+            'temperature_celsius', 'humidity_percent', 'precipitation_mm',
+            'wind_speed_kmh', 'wind_direction_degrees', 'pressure_hpa'
+        ]
+        
+        for col in numeric_columns:
+            # Convert NaN to None for BigQuery compatibility
+            df_bq[col] = df_bq[col].where(pd.notnull(df_bq[col]), None)
+        
+        # Configure load job with explicit schema
+        job_config = bigquery.LoadJobConfig(
+            schema=self.bq_schema,
+            write_disposition=write_disposition or bigquery.WriteDisposition.WRITE_APPEND,
+            create_disposition=bigquery.CreateDisposition.CREATE_IF_NEEDED,
+            source_format=bigquery.SourceFormat.CSV,
+            skip_leading_rows=1,  # Skip header row
+            allow_quoted_newlines=True,
+            allow_jagged_rows=False,
+            max_bad_records=0
+        )
+        
+        # Convert DataFrame to CSV
+        logger.info("Converting DataFrame to CSV format...")
+        with self.metrics.stage('serialise') as counters:
+            csv_buffer = df_bq.to_csv(index=False, na_rep='')
+            counters['rows'] = len(df_bq)
+            counters['bytes'] = len(csv_buffer)
+        
+        # Load data using CSV method
+        logger.info("Starting BigQuery load job...")
+        return client.load_table_from_file(
+            io.StringIO(csv_buffer), 
+            table_id, 
+            job_config=job_config
+        )
+
+    def _load_parquet(self, client: bigquery.Client, df: pd.DataFrame, table_id: str,
+                      write_disposition: str = None):
+        """Submit a load job from a Parquet file that keeps native column types"""
+        import pyarrow.parquet as pq
+
+        table = self.to_arrow(df)
+
+        job_config = bigquery.LoadJobConfig(
+            schema=self.bq_schema,
+            write_disposition=write_disposition or bigquery.WriteDisposition.WRITE_APPEND,
+            create_disposition=bigquery.CreateDisposition.CREATE_IF_NEEDED,
+            source_format=bigquery.SourceFormat.PARQUET,
+        )
+
+        # Small payloads stay in memory, large ones spill to disk instead of growing the heap
+        with tempfile.SpooledTemporaryFile(max_size=self.config.get('spool_max_bytes', 64 * 1024 * 1024)) as buffer:
+            logger.info("Writing DataFrame to Parquet...")
+            with self.metrics.stage('serialise') as counters:
+                pq.write_table(table, buffer, compression='snappy')
+                counters['rows'] = table.num_rows
+                counters['bytes'] = buffer.tell()
+            logger.info(f"Parquet payload size: {buffer.tell()} bytes")
+            buffer.seek(0)
+
+            # The upload completes before load_table_from_file returns, so the buffer can close
+            logger.info("Starting BigQuery load job...")
+            return client.load_table_from_file(buffer, table_id, job_config=job_config, rewind=True)
+
+    def check_schema(self, df: pd.DataFrame) -> None:
+        """Validate DataFrame columns against bq_schema before loading"""
+        expected = [field.name for field in self.bq_schema]
+        missing = [col for col in expected if col not in df.columns]
+        if missing:
+            raise ValueError(f"DataFrame is missing schema columns: {missing}")
+
+        extra = [col for col in df.columns if col not in expected]
+        if extra:
+            raise ValueError(f"DataFrame has columns not in schema: {extra}")
+
+        for field in self.bq_schema:
+            if field.mode == 'REQUIRED' and df[field.name].isnull().any():
+                raise ValueError(f"Required column '{field.name}' contains nulls")
+
+    def to_arrow(self, df: pd.DataFrame):
+        """Convert a transformed DataFrame to an Arrow table typed from bq_schema"""
+        import pyarrow as pa
+
+        self.check_schema(df)
+
+        arrow_types = {
+            'STRING': pa.string(),
+            'TIMESTAMP': pa.timestamp('us', tz='UTC'),
+            'FLOAT64': pa.float64(),
+            'DATE': pa.date32(),
+            'INTEGER': pa.int64(),
+        }
+
+        arrays = []
+        fields = []
+        for field in self.bq_schema:
+            target = arrow_types[field.field_type]
+            array = pa.array(df[field.name], from_pandas=True)
+            if array.type != target:
+                array = array.cast(target)
+            arrays.append(array)
+            fields.append(pa.field(field.name, target, nullable=field.mode != 'REQUIRED'))
+
+        return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
     def serialize_for_xcom(self, df: pd.DataFrame) -> Dict:
         """Serialize DataFrame for XCom with proper data type handling"""
         # Convert DataFrame to records, handling datetime and other complex types
@@ -269,11 +1324,15 @@ class WeatherDataPipeline:
         # Convert datetime columns to ISO format strings
         datetime_columns = df_copy.select_dtypes(include=['datetime64[ns, UTC]', 'datetime64[ns]']).columns
         for col in datetime_columns:
-            df_copy[col] = df_copy[col].dt.strftime('%Y-%m-%d %H:%M:%S UTC')
+            if col != 'date':
+                df_copy[col] = df_copy[col].dt.strftime('%Y-%m-%d %H:%M:%S UTC')
         
         # Convert date columns to string
         if 'date' in df_copy.columns:
-            df_copy['date'] = df_copy['date'].astype(str)
+            if pd.api.types.is_datetime64_any_dtype(df_copy['date']):
+                df_copy['date'] = df_copy['date'].dt.strftime('%Y-%m-%d')
+            else:
+                df_copy['date'] = df_copy['date'].astype(str)
         
         # Handle NaN values
         df_copy = df_copy.where(pd.notnull(df_copy), None)
@@ -315,42 +1374,212 @@ class WeatherDataPipeline:
         
         return df
 
+    def check_data_quality(self, df: pd.DataFrame, rules: Dict[str, Any] = None,
+                           expected_cities: List[str] = None) -> Dict[str, Any]:
+        """Evaluate declarative quality rules on a transformed DataFrame
+
+        Null ratios and range bounds are computed together over one float matrix of the
+        numeric columns; duplicates, per-city counts and freshness are single vectorised
+        operations. Returns {'rows', 'passed', 'checks': [...]} where each check records
+        its metric, threshold, severity and outcome.
+        """
+        rules = rules or self.config.get('quality_rules') or DEFAULT_QUALITY_RULES
+        checks = []
+
+        def add(name, column, value, threshold, passed, severity):
+            checks.append({
+                'check': name, 'column': column, 'value': value,
+                'threshold': threshold, 'passed': bool(passed), 'severity': severity,
+            })
+
+        rows = len(df)
+        add('row_count', None, rows, 1, rows > 0, 'error')
+
+        missing = [col for col in rules.get('required_columns', []) if col not in df.columns]
+        add('required_columns', None, missing, [], not missing, 'error')
+        if rows == 0 or missing:
+            return {'rows': rows, 'passed': False, 'checks': checks}
+
+        null_rules = rules.get('null_ratio', {})
+        range_rules = rules.get('range', {})
+        numeric_columns = [
+            col for col in dict.fromkeys(list(null_rules) + list(range_rules)) if col in df.columns
+        ]
+        if numeric_columns:
+            values = df[numeric_columns].to_numpy(dtype='float64', na_value=np.nan)
+            nulls = np.isnan(values)
+            null_ratios = nulls.sum(axis=0) / rows
+
+            lower = np.array([range_rules.get(col, {}).get('min', -np.inf) for col in numeric_columns])
+            upper = np.array([range_rules.get(col, {}).get('max', np.inf) for col in numeric_columns])
+            with np.errstate(invalid='ignore'):
+                out_of_range = ((values < lower) | (values > upper)).sum(axis=0)
+
+            for i, col in enumerate(numeric_columns):
+                if col in null_rules:
+                    rule = null_rules[col]
+                    ratio = float(null_ratios[i])
+                    add('null_ratio', col, ratio, rule['max'], ratio <= rule['max'],
+                        rule.get('severity', 'error'))
+                if col in range_rules:
+                    rule = range_rules[col]
+                    violations = int(out_of_range[i])
+                    add('range', col, violations, [rule.get('min'), rule.get('max')],
+                        violations <= rule.get('max_violations', 0), rule.get('severity', 'error'))
+
+        duplicate_rule = rules.get('duplicates')
+        if duplicate_rule:
+            duplicates = int(df.duplicated(subset=duplicate_rule['keys']).sum())
+            add('duplicates', ','.join(duplicate_rule['keys']), duplicates, duplicate_rule['max'],
+                duplicates <= duplicate_rule['max'], duplicate_rule.get('severity', 'error'))
+
+        city_rule = rules.get('rows_per_city')
+        if city_rule:
+            counts = df['city'].value_counts()
+            if expected_cities:
+                counts = counts.reindex(expected_cities, fill_value=0)
+            short = {str(city): int(count) for city, count in counts.items() if count < city_rule['min']}
+            add('rows_per_city', 'city', short, city_rule['min'], not short,
+                city_rule.get('severity', 'error'))
+
+        freshness_rule = rules.get('freshness')
+        if freshness_rule:
+            latest = pd.to_datetime(df[freshness_rule['column']], utc=True).max()
+            hours_old = (pd.Timestamp.now(tz='UTC') - latest).total_seconds() / 3600
+            add('freshness', freshness_rule['column'], round(hours_old, 2), freshness_rule['max_age_hours'],
+                hours_old <= freshness_rule['max_age_hours'], freshness_rule.get('severity', 'warning'))
+
+        passed = all(check['passed'] for check in checks if check['severity'] == 'error')
+        return {'rows': rows, 'passed': passed, 'checks': checks}
+
+    def to_xcom(self, data: Union[pd.DataFrame, List[Dict], Dict[str, List]],
+                run_id: str, name: str) -> Any:
+        """Prepare task output for XCom according to xcom_mode
+
+        Recorded as a serialise stage with the rows handed over and the size of what is stored:
+        the artifact file, or the JSON value XCom keeps in records mode.
+        """
+        with self.metrics.stage('serialise') as counters:
+            counters['rows'] = self.count_records(data)
+            if self.config.get('xcom_mode', 'records') == 'artifact':
+                df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+                ref = self.artifact_store.write(df, run_id, name)
+                counters['bytes'] = os.path.getsize(ref['artifact_path'])
+                logger.info(f"Wrote {ref['rows']} rows to artifact {ref['artifact_path']}")
+                return ref
+
+            payload = self.serialize_for_xcom(data) if isinstance(data, pd.DataFrame) else data
+            counters['bytes'] = len(json.dumps(payload, default=str))
+            return payload
+
+    def from_xcom(self, xcom_data: Any) -> Union[pd.DataFrame, List[Dict], Dict[str, List]]:
+        """Restore task input pushed by to_xcom in any mode"""
+        if isinstance(xcom_data, dict) and 'artifact_path' in xcom_data:
+            return self.artifact_store.read(xcom_data)
+        if isinstance(xcom_data, dict) and 'records' in xcom_data:
+            return self.deserialize_from_xcom(xcom_data)
+        return xcom_data
+
+
+def _metric_labels(context: Dict[str, Any]) -> Dict[str, str]:
+    """Labels attached to every exported metric of a task run"""
+    return {
+        'dag': 'weather_data_bigquery_pipeline',
+        'task': context['task_instance'].task_id,
+        'run_id': context['run_id'],
+    }
+
+
+def shard_cities(cities: Dict[str, Dict], shard_index: int, shard_count: int) -> Dict[str, Dict]:
+    """Round-robin slice of the city table for one shard"""
+    return dict(list(cities.items())[shard_index::shard_count])
+
+
+def _artifact_name(task_id: str, context: Dict[str, Any]) -> str:
+    """Artifact name that stays unique across mapped task instances"""
+    map_index = getattr(context['task_instance'], 'map_index', -1)
+    return f"{task_id}_{map_index}" if map_index is not None and map_index >= 0 else task_id
+
+
+def _pull_transformed(pipeline: 'WeatherDataPipeline', context: Dict[str, Any],
+                      source_task_id: str) -> pd.DataFrame:
+    """Pull transform output from a plain task, or from every instance of a mapped one"""
+    xcom_data = context['task_instance'].xcom_pull(task_ids=source_task_id)
+    if not xcom_data:
+        return pd.DataFrame()
+    if isinstance(xcom_data, dict):
+        return pipeline.from_xcom(xcom_data)
+
+    # Mapped upstream: one entry per shard
+    frames = [pipeline.from_xcom(item) for item in xcom_data if item]
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    categorical_city = any(isinstance(frame['city'].dtype, pd.CategoricalDtype) for frame in frames)
+    df = pd.concat(frames, ignore_index=True)
+    if categorical_city:
+        df['city'] = df['city'].astype('category')
+    return df
+
 
 # Airflow task functions with improved error handling
-def extract_weather_data_task(**context):
+def extract_weather_data_task(shard_index: int = None, shard_count: int = 1, **context):
     """Airflow task for data extraction"""
     try:
-        pipeline = WeatherDataPipeline(CONFIG)
+        pipeline = get_pipeline(CONFIG)
+        if shard_index is not None:
+            pipeline.cities = shard_cities(pipeline.cities, shard_index, shard_count)
+            logger.info(f"Shard {shard_index + 1}/{shard_count}: {len(pipeline.cities)} cities")
+        # The pooled session stays open for the next task in this worker
         data = pipeline.extract_weather_data(days_back=7)
         
-        if not data:
+        if not WeatherDataPipeline.count_records(data):
+            if CONFIG.get('incremental'):
+                # Every city is already loaded up to its watermark; downstream tasks no-op too
+                logger.info("No new weather data since the last watermarks, nothing to do")
+                return None
             raise ValueError("No weather data extracted")
         
-        logger.info(f"Extracted {len(data)} records")
-        return data
+        logger.info(f"Extracted {WeatherDataPipeline.count_records(data)} records")
+
+        if CONFIG.get('xcom_mode') == 'artifact' and not shard_index:
+            pipeline.artifact_store.purge(CONFIG.get('artifact_retention_days', 3))
+        xcom_data = pipeline.to_xcom(data, context['run_id'], _artifact_name('extract_weather_data', context))
+        pipeline.metrics.emit(_metric_labels(context))
+        return xcom_data
         
     except Exception as e:
         logger.error(f"Extract task failed: {str(e)}")
         raise
 
-def transform_data_task(**context):
+def transform_data_task(source_task_id: str = 'extract_weather_data', **context):
     """Airflow task for data transformation"""
     try:
-        # Get data from previous task
-        raw_data = context['task_instance'].xcom_pull(task_ids='extract_weather_data')
+        # Get data from previous task (the same shard when both tasks are mapped)
+        task_instance = context['task_instance']
+        map_index = getattr(task_instance, 'map_index', -1)
+        if map_index is not None and map_index >= 0:
+            xcom_data = task_instance.xcom_pull(task_ids=source_task_id, map_indexes=map_index)
+        else:
+            xcom_data = task_instance.xcom_pull(task_ids=source_task_id)
         
-        if not raw_data:
+        if not xcom_data:
+            if CONFIG.get('incremental'):
+                logger.info("No new data from extract task, nothing to transform")
+                return None
             raise ValueError("No data received from extract task")
         
-        pipeline = WeatherDataPipeline(CONFIG)
+        pipeline = get_pipeline(CONFIG)
+        raw_data = pipeline.from_xcom(xcom_data)
         df = pipeline.transform_data(raw_data)
         
         if df.empty:
             raise ValueError("No data after transformation")
         
         # Serialize DataFrame for XCom
-        serialized_data = pipeline.serialize_for_xcom(df)
+        serialized_data = pipeline.to_xcom(df, context['run_id'], _artifact_name('transform_data', context))
         logger.info(f"Transformed {len(df)} records")
+        pipeline.metrics.emit(_metric_labels(context))
         
         return serialized_data
         
@@ -358,69 +1587,61 @@ def transform_data_task(**context):
         logger.error(f"Transform task failed: {str(e)}")
         raise
 
-def load_data_task(**context):
+def load_data_task(source_task_id: str = 'transform_data', **context):
     """Airflow task for loading data to BigQuery"""
     try:
         # Get transformed data from previous task
-        xcom_data = context['task_instance'].xcom_pull(task_ids='transform_data')
-        
-        if not xcom_data:
-            raise ValueError("No data received from transform task")
-        
-        pipeline = WeatherDataPipeline(CONFIG)
-        df = pipeline.deserialize_from_xcom(xcom_data)
+        pipeline = get_pipeline(CONFIG)
+        df = _pull_transformed(pipeline, context, source_task_id)
         
         if df.empty:
+            if CONFIG.get('incremental'):
+                logger.info("No new data to load")
+                return
             raise ValueError("No data to load")
         
         pipeline.load_to_bigquery(df)
         logger.info(f"Successfully loaded {len(df)} records to BigQuery")
+
+        # Only advance the watermark once the rows are safely in BigQuery
+        if CONFIG.get('incremental'):
+            pipeline.update_watermarks(df)
+
+        pipeline.metrics.emit(_metric_labels(context))
         
     except Exception as e:
         logger.error(f"Load task failed: {str(e)}")
         raise
 
-def data_quality_check(**context):
+def data_quality_check(source_task_id: str = 'transform_data', **context):
     """Enhanced data quality check"""
     try:
-        xcom_data = context['task_instance'].xcom_pull(task_ids='transform_data')
+        pipeline = get_pipeline(CONFIG)
+        df = _pull_transformed(pipeline, context, source_task_id)
         
-        if not xcom_data or 'records' not in xcom_data:
+        if df.empty:
+            if CONFIG.get('incremental'):
+                logger.info("No new data to check")
+                return {'rows': 0, 'passed': True, 'checks': []}
             raise ValueError("No data found for quality check")
         
-        records = xcom_data['records']
-        df = pd.DataFrame(records)
+        report = pipeline.check_data_quality(df, expected_cities=list(pipeline.cities))
         
-        # Basic quality checks
-        if df.empty:
-            raise ValueError("No data found after transformation!")
-        
-        # Check for required columns
-        required_columns = ['city', 'timestamp', 'temperature_celsius']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            raise ValueError(f"Missing required columns: {missing_columns}")
-        
-        # Check temperature data quality
-        temp_null_ratio = df['temperature_celsius'].isnull().sum() / len(df)
-        if temp_null_ratio > 0.5:
-            raise ValueError(f"Too many missing temperature values: {temp_null_ratio:.2%}")
-        
-        # Check for duplicate records
-        duplicates = df.duplicated(subset=['city', 'timestamp']).sum()
-        if duplicates > 0:
-            logger.warning(f"Found {duplicates} duplicate records")
-        
-        # Check data freshness (should have recent data)
-        if 'timestamp' in df.columns:
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            latest_timestamp = df['timestamp'].max()
-            hours_old = (datetime.now(tz=pd.Timestamp.now().tz) - latest_timestamp).total_seconds() / 3600
-            if hours_old > 48:  # Data is more than 48 hours old
-                logger.warning(f"Data may be stale. Latest timestamp: {latest_timestamp}")
-        
-        logger.info(f"Data quality check passed. {len(df)} records ready for loading.")
-        logger.info(f"Temperature data completeness: {(1-temp_null_ratio):.2%}")
+        for check in report['checks']:
+            if check['passed']:
+                continue
+            message = f"Quality check '{check['check']}' failed for {check['column']}: " \
+                      f"value={check['value']}, threshold={check['threshold']}"
+            if check['severity'] == 'error':
+                logger.error(message)
+            else:
+                logger.warning(message)
+        
+        if not report['passed']:
+            raise ValueError("Data quality check failed, see errors above")
+        
+        logger.info(f"Data quality check passed. {report['rows']} records ready for loading.")
+        return report
         
     except Exception as e:
         logger.error(f"Data quality check failed: {str(e)}")
@@ -448,25 +1669,48 @@ dag = DAG(
     tags=['weather', 'bigquery', 'etl'],
 )
 
+def build_sharded_tasks(dag: DAG, shard_count: int):
+    """Extract and transform mapped over city shards, fanning in to one quality check and load"""
+    shard_count = max(1, min(shard_count, len(CITIES)))  # Never map an empty shard
+    shards = [{'shard_index': i, 'shard_count': shard_count} for i in range(shard_count)]
+
+    extract_tasks = PythonOperator.partial(
+        task_id='extract_weather_data',
+        python_callable=extract_weather_data_task,
+        dag=dag,
+    ).expand(op_kwargs=shards)
+
+    transform_tasks = PythonOperator.partial(
+        task_id='transform_data',
+        python_callable=transform_data_task,
+        dag=dag,
+    ).expand(op_kwargs=shards)
+
+    return extract_tasks, transform_tasks
+
+
 # Define tasks
-extract_task = PythonOperator(
-    task_id='extract_weather_data',
-    python_callable=extract_weather_data_task,
-    dag=dag,
-)
+if CONFIG.get('shard_count', 1) > 1:
+    extract_task, transform_task = build_sharded_tasks(dag, CONFIG['shard_count'])
+else:
+    extract_task = PythonOperator(
+        task_id='extract_weather_data',
+        python_callable=extract_weather_data_task,
+        dag=dag,
+    )
 
-transform_task = PythonOperator(
-    task_id='transform_data',
-    python_callable=transform_data_task,
+    transform_task = PythonOperator(
+        task_id='transform_data',
+        python_callable=transform_data_task,
+        dag=dag,
+    )
+
+quality_check_task = PythonOperator(
+    task_id='data_quality_check',
+    python_callable=data_quality_check,
     dag=dag,
 )
 
-#quality_check_task = PythonOperator(
-#    task_id='data_quality_check',
-#    python_callable=data_quality_check,
-#    dag=dag,
-#)
-
 load_task = PythonOperator(
     task_id='load_to_bigquery',
     python_callable=load_data_task,
@@ -481,4 +1725,4 @@ notify_success = BashOperator(
 )
 
 # Set task dependencies
-extract_task >> transform_task >> load_task >> notify_success
\ No newline at end of file
+extract_task >> transform_task >> quality_check_task >> load_task >> notify_success
\ No newline at end of file